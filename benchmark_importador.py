@@ -0,0 +1,164 @@
+"""Benchmark: analizador_inteligente_archivos original (iterrows) vs importador vectorizado.
+
+    python benchmark_importador.py --filas 3000 --columnas 30
+
+Genera un export sintético de distribuidor (SKUs con y sin guion, cantidades como
+'2.0', VIN, orden, asesor, cliente, celdas vacías), verifica que ambas versiones
+devuelvan exactamente lo mismo y reporta los tiempos.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+import pandas as pd
+
+import importador
+
+# ==========================================
+# VERSIONES ORIGINALES (REFERENCIA, SIN CAMBIOS)
+# ==========================================
+def analizador_tokenization(df_raw):
+    hallazgos = []; metadata = {}
+    df = df_raw.fillna('').astype(str).apply(lambda x: x.str.upper().str.strip())
+    patron_vin = r'\b[A-HJ-NPR-Z0-9]{17}\b'
+    patron_orden = r'\b\d{8}\b'
+    patron_sku_flex = r'\b[A-Z0-9]{5}-?[A-Z0-9]{5}(?:-?[A-Z0-9]{2})?\b'
+    for r_idx, row in df.iterrows():
+        for c_idx, val in row.items():
+            val_str = str(val)
+            if 'VIN' not in metadata:
+                m = re.search(patron_vin, val_str)
+                if m: metadata['VIN'] = m.group(0)
+            if 'ORDEN' not in metadata:
+                m = re.search(patron_orden, val_str)
+                if m: metadata['ORDEN'] = m.group(0)
+            if re.match(patron_sku_flex, val_str) and len(val_str.replace('-','')) in [10, 12] and val_str != metadata.get('VIN', ''):
+                cant = 1
+                try:
+                    col_pos = df.columns.get_loc(c_idx)
+                    if col_pos + 1 < len(df.columns):
+                        vecino = str(df.iloc[r_idx, col_pos + 1]).replace('.0', '').strip()
+                        if vecino.isdigit(): cant = int(vecino)
+                except: pass
+                hallazgos.append({'sku': val_str, 'cant': cant})
+    return hallazgos, metadata
+
+def analizador_pruebas(df_raw):
+    hallazgos = []; metadata = {}
+    df = df_raw.astype(str).apply(lambda x: x.str.upper().str.strip())
+    patron_vin = r'\b[A-HJ-NPR-Z0-9]{17}\b'
+    patron_orden_8 = r'\b\d{8}\b'
+    patron_sku_fmt = r'\b[A-Z0-9]{5}-[A-Z0-9]{5}\b'
+    patron_sku_pln = r'\b[A-Z0-9]{10,12}\b'
+    keywords = {'ORDEN': ['ORDEN', 'FOLIO', 'OT', 'OS'], 'ASESOR': ['ASESOR', 'SA', 'ATENDIO', 'ADVISOR'], 'CLIENTE': ['CLIENTE', 'ATTN', 'NOMBRE']}
+
+    for r_idx, row in df.iterrows():
+        for c_idx, val in row.items():
+            if 'VIN' not in metadata:
+                m = re.search(patron_vin, val)
+                if m: metadata['VIN'] = m.group(0)
+
+            if 'ORDEN' not in metadata:
+                if any(k in val for k in keywords['ORDEN']):
+                    m = re.search(patron_orden_8, val)
+                    if m: metadata['ORDEN'] = m.group(0)
+                    else:
+                        try:
+                            vecino = str(df.iloc[r_idx, df.columns.get_loc(c_idx)+1])
+                            m2 = re.search(patron_orden_8, vecino)
+                            if m2: metadata['ORDEN'] = m2.group(0)
+                        except: pass
+
+            if 'ASESOR' not in metadata and any(k in val for k in keywords['ASESOR']):
+                cont = re.sub(r'(?:ASESOR|SA|ATENDIO|ADVISOR)[\:\.\-\s]*', '', val).strip()
+                if len(cont)>4 and not re.search(r'\d', cont): metadata['ASESOR'] = cont
+                else:
+                    try:
+                        vec = str(df.iloc[r_idx, df.columns.get_loc(c_idx)+1]).strip()
+                        if len(vec)>4 and not re.search(r'\d', vec): metadata['ASESOR'] = vec
+                    except: pass
+
+            if 'CLIENTE' not in metadata and any(k in val for k in keywords['CLIENTE']):
+                cont = re.sub(r'(?:CLIENTE|ATTN|NOMBRE)[\:\.\-\s]*', '', val).strip()
+                if len(cont)>4: metadata['CLIENTE'] = cont
+                else:
+                    try:
+                        vec = str(df.iloc[r_idx, df.columns.get_loc(c_idx)+1]).strip()
+                        if len(vec)>4: metadata['CLIENTE'] = vec
+                    except: pass
+
+            es_sku = False; sku_det = None
+            if re.match(patron_sku_fmt, val): sku_det = val; es_sku = True
+            elif re.match(patron_sku_pln, val) and not val.isdigit(): sku_det = val; es_sku = True
+
+            if es_sku:
+                cant = 1
+                try:
+                    vecino = df.iloc[r_idx, df.columns.get_loc(c_idx)+1].replace('.0', '')
+                    if vecino.isdigit(): cant = int(vecino)
+                except: pass
+                hallazgos.append({'sku': sku_det, 'cant': cant})
+
+    if 'ORDEN' not in metadata:
+        for _, row in df.iterrows():
+            for val in row:
+                m = re.search(patron_orden_8, str(val))
+                if m: metadata['ORDEN'] = m.group(0); break
+            if 'ORDEN' in metadata: break
+
+    return hallazgos, metadata
+
+# ==========================================
+# DATOS SINTÉTICOS
+# ==========================================
+def _sku(rnd):
+    a = ''.join(rnd.choices(string.ascii_uppercase + string.digits, k=5))
+    b = ''.join(rnd.choices(string.ascii_uppercase + string.digits, k=5))
+    return rnd.choice([f"{a}-{b}", f"{a}{b}", f"{a}-{b}-{rnd.choice(['01', 'A0'])}", f"{a}{b}00"])
+
+def export_sintetico(filas, columnas, semilla=7):
+    rnd = random.Random(semilla)
+    relleno = ['', None, 'FILTRO DE ACEITE', 'costo', 'TOTAL', 'nos vemos', 'Sa', 'Pieza', '12345678', 'N/A', '3.5', 'MXN']
+    datos = []
+    for r in range(filas):
+        fila = [rnd.choice(relleno) for _ in range(columnas)]
+        if rnd.random() < 0.3:
+            c = rnd.randrange(columnas)
+            fila[c] = _sku(rnd)
+            if c + 1 < columnas: fila[c + 1] = rnd.choice([2, '3.0', 1.0, ' 4 ', 'x', '10.0', None])
+        datos.append(fila)
+    datos[filas // 2][0] = "VIN: JTDKN3DU0A0123456"
+    datos[filas // 3][1] = "Folio OT"
+    datos[filas // 3][2] = "20260114"
+    datos[filas // 4][3] = "Asesor:"
+    datos[filas // 4][4] = "juan perez"
+    datos[filas // 5][5] = "Cliente: TRANSPORTES DEL NORTE"
+    return pd.DataFrame(datos, columns=[f"COL{i}" for i in range(columnas)])
+
+def _medir(funcion, df, repeticiones):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones): resultado = funcion(df)
+    return resultado, (time.perf_counter() - t0) / repeticiones
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=3000)
+    parser.add_argument("--columnas", type=int, default=30)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    df = export_sintetico(args.filas, args.columnas)
+    print(f"Export sintético: {args.filas:,} filas x {args.columnas} columnas")
+    # El original de pruebas.py truena con NaN en pandas >= 3 (astype(str) ya no da 'nan')
+    for nombre, original, nuevo, entrada in (
+        ("tokenization.py", analizador_tokenization, importador.analizar_archivo, df),
+        ("pruebas.py", analizador_pruebas, importador.analizar_archivo_detallado, df.fillna('')),
+    ):
+        esperado, t_original = _medir(original, entrada, 1)
+        obtenido, t_nuevo = _medir(nuevo, entrada, args.repeticiones)
+        assert obtenido == esperado, f"{nombre}: la salida cambió"
+        assert list(obtenido[1]) == list(esperado[1]), f"{nombre}: cambió el orden de metadata"
+        print(f"{nombre:16s} iterrows {t_original * 1000:9.1f} ms | vectorizado {t_nuevo * 1000:8.1f} ms "
+              f"| x{t_original / t_nuevo:5.1f} | {len(obtenido[0])} SKUs, metadata {obtenido[1]}")
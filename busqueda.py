@@ -0,0 +1,188 @@
+"""Índice de búsqueda del catálogo para el cuadro "Buscar Refacción".
+
+Se construye una vez junto con el catálogo:
+- arreglo ordenado de SKU_CLEAN para búsquedas por prefijo con bisect;
+- índice invertido de trigramas sobre SKU_CLEAN y descripción normalizada.
+
+`buscar` devuelve las posiciones (para df.iloc) de los k mejores resultados ordenados
+por relevancia: SKU exacto > prefijo de SKU > descripción que empieza con el texto >
+palabra que empieza con el texto > subcadena > coincidencia parcial de trigramas.
+
+Sin índice (aún construyéndose o si falló), `buscar_por_bloques` recorre el DataFrame
+por bloques solo en las columnas SKU/descripción/precio y para al juntar k resultados.
+
+    python busqueda.py FILTRO     # resultados y tiempo por consulta
+"""
+import bisect
+import heapq
+import time
+import unicodedata
+from array import array
+
+# ==========================================
+# NORMALIZACIÓN
+# ==========================================
+def normalizar(texto):
+    """Mayúsculas y sin acentos, para comparar 'balata' con 'BALATA' o 'afinación' con 'AFINACION'."""
+    if not isinstance(texto, str): return ''
+    texto = unicodedata.normalize('NFKD', texto.upper())
+    return ''.join(c for c in texto if not unicodedata.combining(c)).strip()
+
+def limpiar_consulta_sku(texto):
+    return normalizar(texto).replace('-', '').replace(' ', '')
+
+def trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+# ==========================================
+# ÍNDICE
+# ==========================================
+class IndiceBusqueda:
+    def __init__(self, skus_clean, descripciones):
+        self.skus = [s if isinstance(s, str) else '' for s in skus_clean]
+        self.descs = [normalizar(d) for d in descripciones]
+
+        orden = sorted(range(len(self.skus)), key=self.skus.__getitem__)
+        self._skus_ordenados = [self.skus[i] for i in orden]
+        self._pos_ordenadas = array('I', orden)
+        self._descs_ordenadas = array('I', sorted(range(len(self.descs)), key=self.descs.__getitem__))
+
+        # Inicio de cada palabra (sin contar la primera) de la descripción, codificado como pos << 8 | offset y
+        # ordenado por el texto desde ese offset: bisect da "empieza con" por palabra.
+        claves = array('Q')
+        for pos, desc in enumerate(self.descs):
+            for i in range(min(len(desc), 256)):
+                if i and desc[i].isalnum() and not desc[i - 1].isalnum():
+                    claves.append(pos << 8 | i)
+        self._palabras = array('Q', sorted(claves, key=self._sufijo))
+
+        postings = {}
+        for pos, (sku, desc) in enumerate(zip(self.skus, self.descs)):
+            for tri in trigramas(sku) | trigramas(desc):
+                lista = postings.get(tri)
+                if lista is None: lista = postings[tri] = array('I')
+                lista.append(pos)
+        self._trigramas = postings
+
+    def __len__(self): return len(self.skus)
+
+    def _sufijo(self, clave):
+        return self.descs[clave >> 8][clave & 0xFF:]
+
+    def _por_prefijo_sku(self, prefijo, limite):
+        i = bisect.bisect_left(self._skus_ordenados, prefijo)
+        fin = min(len(self._skus_ordenados), i + limite)
+        while i < fin and self._skus_ordenados[i].startswith(prefijo):
+            yield self._pos_ordenadas[i]; i += 1
+
+    def _por_prefijo_desc(self, prefijo, limite):
+        i = bisect.bisect_left(self._descs_ordenadas, prefijo, key=self.descs.__getitem__)
+        fin = min(len(self._descs_ordenadas), i + limite)
+        while i < fin and self.descs[self._descs_ordenadas[i]].startswith(prefijo):
+            yield self._descs_ordenadas[i]; i += 1
+
+    def _por_prefijo_palabra(self, prefijo, limite):
+        i = bisect.bisect_left(self._palabras, prefijo, key=self._sufijo)
+        fin = min(len(self._palabras), i + limite)
+        while i < fin and self._sufijo(self._palabras[i]).startswith(prefijo):
+            yield self._palabras[i]; i += 1
+
+    def _por_trigramas(self, q_desc, q_sku, limite):
+        """Subcadena en medio de palabra: descripciones y SKUs se recorren cada uno por su
+        lista de trigramas más corta (ya viene en orden de archivo) verificando la subcadena
+        real. Con la unión de ambos, un trigrama que solo existe en la forma sin espacios
+        (p. ej. 'EPA' de 'RAKEPAD') dejaba la lista vacía y no se revisaba nada."""
+        encontrados = {}
+        for consulta, textos, puntaje in ((q_sku, self.skus, 150), (q_desc, self.descs, 100)):
+            if not consulta: continue
+            lista = min((self._trigramas.get(t, ()) for t in trigramas(consulta)), key=len, default=())
+            for pos in lista:
+                if len(encontrados) >= limite: break
+                if pos not in encontrados and consulta in textos[pos]: encontrados[pos] = puntaje
+        listas = [self._trigramas.get(t, ()) for t in trigramas(q_desc) | trigramas(q_sku)]
+        return encontrados, listas
+
+    def _difusa(self, listas):
+        """Respaldo para errores de dedo: proporción de trigramas compartidos. Los trigramas
+        presentes en más del 10% del catálogo casi no distinguen y se ignoran."""
+        tope = max(1, len(self) // 10)
+        utiles = [lista for lista in listas if 0 < len(lista) <= tope]
+        conteo = {}
+        for lista in utiles:
+            for pos in lista:
+                conteo[pos] = conteo.get(pos, 0) + 1
+        minimo = max(1, len(utiles) // 2)
+        return {pos: 90 * n / len(listas) for pos, n in conteo.items() if n >= minimo}
+
+    def buscar(self, consulta, k=3, limite=200):
+        """Posiciones de los k resultados más relevantes para `consulta`.
+
+        Cada nivel solo se consulta si los anteriores no juntaron k resultados, y
+        ninguno revisa más de `limite` filas, así que el costo no depende de cuántas
+        filas del catálogo coincidan.
+        """
+        q_desc = normalizar(consulta)
+        q_sku = limpiar_consulta_sku(consulta)
+        if not q_desc: return []
+
+        puntajes = {}
+        # Consulta sin letras ni números de SKU ('-', ' - '): el prefijo vacío traería los primeros SKUs del orden
+        for pos in (self._por_prefijo_sku(q_sku, limite) if q_sku else ()):
+            puntajes[pos] = 1000 if self.skus[pos] == q_sku else 500 - (len(self.skus[pos]) - len(q_sku))
+        # Descripción que empieza con la consulta > palabra intermedia; la más corta es la más específica
+        for pos in self._por_prefijo_desc(q_desc, limite):
+            puntajes.setdefault(pos, 300 - len(self.descs[pos]) / 10000)
+        for clave in self._por_prefijo_palabra(q_desc, limite):
+            puntajes.setdefault(clave >> 8, 200 - len(self.descs[clave >> 8]) / 10000)
+
+        if len(puntajes) < k:
+            encontrados, listas = self._por_trigramas(q_desc, q_sku, limite)
+            for pos, p in encontrados.items(): puntajes.setdefault(pos, p)
+            if not encontrados and len(puntajes) < k and listas:  # Difusa solo si ninguna subcadena coincidió
+                for pos, p in self._difusa(listas).items(): puntajes.setdefault(pos, p)
+
+        # Empates: se respeta el orden del archivo
+        return [pos for pos, _ in heapq.nlargest(k, puntajes.items(), key=lambda par: (par[1], -par[0]))]
+
+# ==========================================
+# BÚSQUEDA POR BLOQUES (SIN ÍNDICE)
+# ==========================================
+def buscar_por_bloques(df, consulta, columnas, k=3, tamano_bloque=20000):
+    """Posiciones de las primeras k filas que contienen `consulta` (sin mayúsculas/minúsculas).
+
+    Solo revisa `columnas` y SKU_CLEAN, bloque por bloque, y se detiene en cuanto junta
+    k coincidencias: una consulta común como "FILTRO" termina en el primer bloque.
+    """
+    q = consulta.strip()
+    q_sku = limpiar_consulta_sku(consulta)
+    if not q: return []
+    encontrados = []
+    for inicio in range(0, len(df), tamano_bloque):
+        bloque = df.iloc[inicio:inicio + tamano_bloque]
+        mask = bloque['SKU_CLEAN'].str.contains(q_sku, regex=False) if q_sku else False
+        for c in columnas:
+            mask = mask | bloque[c].astype(str).str.contains(q, case=False, regex=False)
+        faltan = k - len(encontrados)
+        encontrados.extend(inicio + int(i) for i in mask.to_numpy(dtype=bool, na_value=False).nonzero()[0][:faltan])
+        if len(encontrados) >= k: break
+    return encontrados
+
+def top_k(df, indice, consulta, columnas, k=3):
+    """Usa el índice si ya está construido; si no, la búsqueda por bloques."""
+    if indice is not None: return indice.buscar(consulta, k=k)
+    return buscar_por_bloques(df, consulta, columnas, k=k)
+
+if __name__ == "__main__":
+    import sys
+    import catalogo
+    df, c_sku, c_desc, _ = catalogo.cargar_catalogo()
+    if df is None: sys.exit("Sin catálogo.")
+    t0 = time.perf_counter()
+    indice = IndiceBusqueda(df['SKU_CLEAN'], df[c_desc])
+    print(f"Índice: {len(indice):,} filas, {len(indice._trigramas):,} trigramas en {time.perf_counter() - t0:.2f}s")
+    for q in sys.argv[1:] or ['FILTRO', '90915', 'BALATA']:
+        t0 = time.perf_counter(); posiciones = indice.buscar(q, k=3); dt = (time.perf_counter() - t0) * 1000
+        print(f"{q!r}: {dt:.3f} ms")
+        for pos in posiciones: print(f"   {df[c_sku].iloc[pos]}  {df[c_desc].iloc[pos]}")
+        t0 = time.perf_counter(); buscar_por_bloques(df, q, [c_sku, c_desc, 'PRECIO_NUM'], k=3)
+        print(f"   por bloques (sin índice): {(time.perf_counter() - t0) * 1000:.3f} ms")
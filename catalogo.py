@@ -0,0 +1,531 @@
+"""Carga compartida del catálogo de refacciones (clientes.py, pruebas.py, tokenization.py).
+
+El zip con el xlsx/csv se convierte una sola vez a un archivo Arrow IPC sin
+comprimir con las columnas normalizadas SKU_CLEAN y PRECIO_NUM. El archivo guarda
+en sus metadatos el tamaño, mtime y sha256 del zip de origen, así que si el zip
+cambia se reconstruye solo. La columna DESC_ES trae la descripción ya traducida
+(ver `python traduccion.py`), para no traducir en cada consulta.
+
+El archivo se abre con memory-map y se expone como DataFrame respaldado por Arrow
+(pd.ArrowDtype), sin copiar a objetos de Python: todas las sesiones y todos los
+procesos de Streamlit comparten las mismas páginas de solo lectura del sistema.
+
+Modo compacto (MODO_COMPACTO, por defecto): el cache solo guarda SKU, descripción,
+SKU_CLEAN y DESC_ES; el precio va como centavos int32 (PRECIO_NUM se deriva al abrir)
+y las columnas de texto con muchos valores repetidos se guardan como diccionario
+(categorías en pandas).
+
+Las listas parciales de precios (cambios, altas y bajas) se aplican sobre el cache
+sin releer el xlsx completo (`aplicar_delta`). Cada delta sube `version_datos` en
+los metadatos y `firma_catalogo` la incluye, así las sesiones abiertas toman los
+precios nuevos en su siguiente rerun y de una sola vez (el archivo se reemplaza
+atómicamente). `version_estructura` solo sube si cambian filas o descripciones:
+si no, el índice de búsqueda se reutiliza.
+
+En las apps, `CatalogoVivo` revisa en un hilo de fondo si cambió la firma y arma la
+versión nueva (catálogo + índice) fuera del request; luego la cambia de una sola
+asignación. Cada rerun toma la versión vigente completa.
+
+    python catalogo.py                       # en el deploy, antes de `streamlit run`: deja listo el cache
+    python catalogo.py --memoria             # memoria antes/después: pandas dtype=str vs compacto mapeado
+    python catalogo.py --delta cambios.xlsx  # aplica una lista parcial de precios
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from collections import namedtuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+ARCHIVO_ZIP = "base_datos_2026.zip"
+ARCHIVO_CACHE = "base_datos_2026.arrow"
+VERSION_FORMATO = 4  # Subir al cambiar la normalización: fuerza reconstruir el cache
+MODO_COMPACTO = True
+UMBRAL_CATEGORIA = 0.5  # Texto con (valores únicos / filas) <= umbral se guarda como diccionario
+INTERVALO_REVISION = 10  # Segundos entre revisiones del zip/deltas en el hilo de recarga
+_CLAVE_META = b'catalogo'
+
+# ==========================================
+# FIRMA DEL ZIP (INVALIDACIÓN)
+# ==========================================
+def firma_archivo(ruta=ARCHIVO_ZIP):
+    """Firma barata (tamaño, mtime) para usar como llave de st.cache_*."""
+    try:
+        st_zip = os.stat(ruta)
+        return st_zip.st_size, st_zip.st_mtime_ns
+    except OSError:
+        return None
+
+def firma_catalogo(ruta_zip=ARCHIVO_ZIP, ruta_cache=ARCHIVO_CACHE):
+    """(tamaño, mtime, version_datos, version_estructura): cambia con el zip o con cada delta aplicado."""
+    firma = firma_archivo(ruta_zip)
+    if firma is None: return None
+    meta = _leer_meta_cache(ruta_cache) or {}
+    if (meta.get('size'), meta.get('mtime_ns')) != firma: return (*firma, 0, 0)  # Se reconstruirá desde el zip
+    return (*firma, meta.get('version_datos', 0), meta.get('version_estructura', 0))
+
+def firma_estructura(firma):
+    """Parte de la firma que afecta al índice de búsqueda (filas y descripciones, no precios)."""
+    return None if firma is None else (firma[0], firma[1], firma[3])
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _leer_meta_cache(ruta_cache):
+    try:
+        meta = pa.ipc.open_file(pa.memory_map(ruta_cache, 'r')).schema.metadata or {}
+        return json.loads(meta[_CLAVE_META])
+    except Exception:
+        return None
+
+def _cache_vigente(ruta_zip, ruta_cache):
+    meta = _leer_meta_cache(ruta_cache)
+    if not meta or meta.get('version') != VERSION_FORMATO: return None
+    if meta.get('compacto', False) != MODO_COMPACTO: return None
+    size, mtime = firma_archivo(ruta_zip)
+    if meta.get('size') == size and meta.get('mtime_ns') == mtime: return meta
+    # Mismo tamaño pero otro mtime (copia, checkout): decide el contenido
+    if meta.get('size') == size and meta.get('sha256') == _sha256(ruta_zip):
+        # Se guarda el mtime nuevo: con el viejo, firma_catalogo daría siempre "se reconstruirá"
+        # (versión 0) y los deltas y DESC_ES que se escriban después no se verían
+        meta['mtime_ns'] = mtime
+        try: _escribir_tabla(pa.ipc.open_file(pa.memory_map(ruta_cache, 'r')).read_all(), meta, ruta_cache)
+        except OSError: pass  # Sin permisos de escritura: se sirve igual
+        return meta
+    return None
+
+# ==========================================
+# LECTURA Y NORMALIZACIÓN
+# ==========================================
+def _leer_zip(ruta_zip):
+    with zipfile.ZipFile(ruta_zip, "r") as z:
+        # Buscar archivos válidos (ignorando temporales y macosx)
+        archivos_validos = [
+            f for f in z.namelist()
+            if f.lower().endswith(('.xlsx', '.xls', '.csv'))
+            and not os.path.basename(f).startswith('~')
+            and '__MACOSX' not in f
+        ]
+        if not archivos_validos: return None
+        archivo_elegido = archivos_validos[0]
+        with z.open(archivo_elegido) as f:
+            if archivo_elegido.lower().endswith('.csv'):
+                try:
+                    return pd.read_csv(f, dtype=str)
+                except UnicodeDecodeError:
+                    f.seek(0)
+                    return pd.read_csv(f, dtype=str, encoding='latin-1')
+            return pd.read_excel(f, dtype=str)
+
+def detectar_columnas(columnas):
+    """Devuelve (c_sku, c_desc, c_precio) a partir de los encabezados ya en mayúsculas."""
+    c_sku = next((c for c in columnas if c == 'ITEM'), None)
+    if not c_sku:
+        c_sku = next((c for c in columnas if 'PART' in c or 'SKU' in c or 'NUM' in c), None)
+    c_desc = next((c for c in columnas if 'DESC' in c), c_sku)
+    c_precio = next((c for c in columnas if c == 'TOTAL_UNITARIO'), None)
+    if not c_precio:
+        c_precio = next((c for c in columnas if 'TOTAL' in c or 'PRECIO' in c or 'PRICE' in c or 'UNITARIO' in c or 'IMPORTE' in c), None)
+    return c_sku, c_desc, c_precio
+
+def limpiar_sku(serie):
+    return serie.astype(str).str.replace('-', '', regex=False).str.replace(' ', '', regex=False).str.strip().str.upper()
+
+def parsear_precios(serie):
+    """Convierte texto de precio a float en bloque. Devuelve (precios, filas_fallidas).
+
+    Acepta '$1,234.56', '1234.56' y la variante con coma decimal '1.234,56' / '12,50'.
+    Vacíos y no numéricos quedan en 0.0; solo los no vacíos cuentan como fallidos.
+    """
+    txt = serie.astype(str).str.replace(r'[^\d,.\-]', '', regex=True)
+    coma_decimal = txt.str.contains(r',\d{1,2}$', regex=True)
+    normal = txt.str.replace(',', '', regex=False)
+    europeo = txt.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    precios = pd.to_numeric(normal.where(~coma_decimal, europeo), errors='coerce')
+    vacios = serie.isna() | (serie.astype(str).str.strip() == '')  # 'N/A' o 'SIN PRECIO' sí cuentan como fallidos
+    fallidos = int((precios.isna() & ~vacios).sum())
+    return precios.fillna(0.0).astype('float64'), fallidos
+
+def construir_catalogo(ruta_zip=ARCHIVO_ZIP):
+    """Lee el zip y devuelve (df, c_sku, c_desc, c_precio) normalizado, o None."""
+    df = _leer_zip(ruta_zip)
+    if df is None: return None
+    df.dropna(how='all', inplace=True)
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    c_sku, c_desc, c_precio = detectar_columnas(df.columns)
+    if not c_sku or not c_precio: return None
+
+    df['SKU_CLEAN'] = limpiar_sku(df[c_sku])
+    df.drop_duplicates(subset=['SKU_CLEAN'], keep='first', inplace=True)
+    df['PRECIO_NUM'], fallidos = parsear_precios(df[c_precio])
+    df.reset_index(drop=True, inplace=True)
+    df.attrs['precios_fallidos'] = fallidos
+    return df, c_sku, c_desc, c_precio
+
+# ==========================================
+# ARTEFACTO ARROW (MEMORY-MAP)
+# ==========================================
+def _tipo_pandas(tipo):
+    # Los diccionarios salen como Categorical (códigos + categorías únicas); lo demás, ArrowDtype sin copia
+    return None if pa.types.is_dictionary(tipo) else pd.ArrowDtype(tipo)
+
+def abrir_mapeado(ruta_cache=ARCHIVO_CACHE):
+    """DataFrame de solo lectura cuyos buffers viven en el archivo mapeado (no en el heap)."""
+    tabla = pa.ipc.open_file(pa.memory_map(ruta_cache, 'r')).read_all()
+    df = tabla.to_pandas(types_mapper=_tipo_pandas)
+    if 'PRECIO_NUM' not in df.columns and 'PRECIO_CENTAVOS' in df.columns:
+        df['PRECIO_NUM'] = df['PRECIO_CENTAVOS'].astype('float64[pyarrow]') / 100
+    return df
+
+def _compactar_tabla(tabla, meta):
+    """Columnas usadas, precio en centavos int32 y diccionario en texto repetitivo. Idempotente."""
+    columnas = [c for c in dict.fromkeys([meta['c_sku'], meta['c_desc'], 'SKU_CLEAN', 'DESC_ES', 'PRECIO_CENTAVOS']) if c in tabla.column_names]
+    compacta = tabla.select(columnas)
+    if 'PRECIO_NUM' in tabla.column_names:
+        centavos = pc.round(pc.multiply(tabla.column('PRECIO_NUM'), 100)).cast(pa.int32())
+        if 'PRECIO_CENTAVOS' in compacta.column_names:
+            compacta = compacta.set_column(compacta.column_names.index('PRECIO_CENTAVOS'), 'PRECIO_CENTAVOS', centavos)
+        else:
+            compacta = compacta.append_column('PRECIO_CENTAVOS', centavos)
+    for i, nombre in enumerate(compacta.column_names):
+        columna = compacta.column(i)
+        # SKU y SKU_CLEAN son únicos: como diccionario solo crecerían
+        if nombre in (meta['c_sku'], 'SKU_CLEAN') or not (pa.types.is_string(columna.type) or pa.types.is_large_string(columna.type)): continue
+        if len(columna) and len(pc.unique(columna)) / len(columna) <= UMBRAL_CATEGORIA:
+            compacta = compacta.set_column(i, nombre, pc.dictionary_encode(columna).combine_chunks())
+    return compacta
+
+def _leer_editable(ruta_cache):
+    """Copia en pandas del cache con PRECIO_NUM y texto plano (sin categorías), para modificarla y reescribirla."""
+    tabla = pa.ipc.open_file(pa.memory_map(ruta_cache, 'r')).read_all()
+    for i, campo in enumerate(tabla.schema):
+        if pa.types.is_dictionary(campo.type):
+            tabla = tabla.set_column(i, campo.name, tabla.column(i).cast(campo.type.value_type))
+    df = tabla.to_pandas()
+    if 'PRECIO_NUM' not in df.columns and 'PRECIO_CENTAVOS' in df.columns:
+        df['PRECIO_NUM'] = df.pop('PRECIO_CENTAVOS') / 100
+    return df
+
+def _escribir_tabla(tabla, meta, ruta_cache):
+    if meta.get('compacto'): tabla = _compactar_tabla(tabla, meta)
+    esquema_meta = dict(tabla.schema.metadata or {})
+    esquema_meta[_CLAVE_META] = json.dumps(meta).encode('utf-8')
+    tabla = tabla.replace_schema_metadata(esquema_meta)
+    tmp = f"{ruta_cache}.{os.getpid()}.tmp"
+    # Sin compresión: es requisito para que el memory-map no copie los buffers
+    with pa.OSFile(tmp, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(tmp, ruta_cache)  # Atómico: otro proceso nunca ve un archivo a medias
+
+def _escribir_cache(df, meta, ruta_cache):
+    _escribir_tabla(pa.Table.from_pandas(df, preserve_index=False), meta, ruta_cache)
+
+def _subir_version(meta, estructura):
+    """Toda reescritura del cache sube `version_datos` (y `version_estructura` si cambian filas o
+    descripciones) para que `firma_catalogo` cambie y las apps recarguen."""
+    meta['version_datos'] = meta.get('version_datos', 0) + 1
+    if estructura: meta['version_estructura'] = meta.get('version_estructura', 0) + 1
+
+# ==========================================
+# DESCRIPCIÓN EN ESPAÑOL PRECALCULADA (DESC_ES)
+# ==========================================
+def _desc_es_conocidas(descs):
+    """Traducciones ya guardadas por traduccion.py (sin red); NaN donde no hay."""
+    try:
+        import traduccion
+        conocidas = traduccion.obtener_cache().todas()
+    except Exception:
+        conocidas = {}
+    return descs.map(conocidas).astype(object)
+
+def guardar_desc_es(traducciones, ruta_cache=ARCHIVO_CACHE):
+    """Escribe/actualiza la columna DESC_ES del cache. Devuelve cuántas filas quedaron traducidas."""
+    meta = _leer_meta_cache(ruta_cache)
+    tabla = pa.ipc.open_file(pa.memory_map(ruta_cache, 'r')).read_all()
+    desc_es = pa.array([traducciones.get(d) for d in tabla.column(meta['c_desc']).to_pylist()], type=pa.string())
+    if 'DESC_ES' in tabla.column_names:
+        tabla = tabla.set_column(tabla.column_names.index('DESC_ES'), 'DESC_ES', desc_es)
+    else:
+        tabla = tabla.append_column('DESC_ES', desc_es)
+    _subir_version(meta, estructura=False)  # DESC_ES no entra al índice de búsqueda
+    _escribir_tabla(tabla, meta, ruta_cache)
+    return len(desc_es) - desc_es.null_count
+
+def descripcion_es(fila):
+    """DESC_ES precalculada de una fila del catálogo, o None si no se ha pretraducido."""
+    valor = fila.get('DESC_ES')
+    return valor if isinstance(valor, str) and valor.strip() else None
+
+def cargar_catalogo(ruta_zip=ARCHIVO_ZIP, ruta_cache=ARCHIVO_CACHE):
+    """Devuelve (df, c_sku, c_desc, c_precio); (None, None, None, None) si no hay catálogo."""
+    vacio = (None, None, None, None)
+    if not os.path.exists(ruta_zip): return vacio
+
+    if os.path.exists(ruta_cache):
+        meta = _cache_vigente(ruta_zip, ruta_cache)
+        if meta:
+            try:
+                return abrir_mapeado(ruta_cache), meta['c_sku'], meta['c_desc'], meta['c_precio']
+            except Exception: pass
+
+    try:
+        resultado = construir_catalogo(ruta_zip)
+    except Exception:
+        return vacio
+    if resultado is None: return vacio
+    df, c_sku, c_desc, c_precio = resultado
+    df['DESC_ES'] = _desc_es_conocidas(df[c_desc])
+
+    size, mtime = firma_archivo(ruta_zip)
+    previa = _leer_meta_cache(ruta_cache) or {}
+    meta = {
+        'version': VERSION_FORMATO, 'size': size, 'mtime_ns': mtime, 'sha256': _sha256(ruta_zip),
+        'c_sku': c_sku, 'c_desc': c_desc, 'c_precio': c_precio,
+        'filas': len(df), 'precios_fallidos': df.attrs.get('precios_fallidos', 0),
+        'version_datos': 0, 'version_estructura': 0, 'deltas': [], 'compacto': MODO_COMPACTO,
+    }
+    if (previa.get('size'), previa.get('mtime_ns')) == (size, mtime):
+        # Mismo zip (cambió el formato o el cache estaba dañado): la firma debe cambiar igual
+        meta['version_datos'], meta['version_estructura'] = previa.get('version_datos', 0), previa.get('version_estructura', 0)
+        _subir_version(meta, estructura=True)
+    try:
+        _escribir_cache(df, meta, ruta_cache)
+        return abrir_mapeado(ruta_cache), c_sku, c_desc, c_precio
+    except Exception:
+        return df, c_sku, c_desc, c_precio  # Sin permisos de escritura: se sirve sin cache
+
+# ==========================================
+# ACTUALIZACIONES PARCIALES (DELTAS)
+# ==========================================
+BAJAS = {'BAJA', 'ELIMINAR', 'BORRAR', 'DELETE', 'D'}
+
+def leer_delta(ruta_delta):
+    """Lista parcial (xlsx/csv) normalizada: SKU_CLEAN, PRECIO_NUM, precio y descripción crudos, ES_BAJA.
+
+    La columna ACCION es opcional: BAJA/ELIMINAR/BORRAR quitan el SKU; cualquier otro
+    valor (o sin columna) da de alta o actualiza. Si un SKU se repite, gana la última fila.
+    """
+    if ruta_delta.lower().endswith('.csv'):
+        try: df = pd.read_csv(ruta_delta, dtype=str)
+        except UnicodeDecodeError: df = pd.read_csv(ruta_delta, dtype=str, encoding='latin-1')
+    else:
+        df = pd.read_excel(ruta_delta, dtype=str)
+    df.dropna(how='all', inplace=True)
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    c_sku, c_desc, c_precio = detectar_columnas(df.columns)
+    if not c_sku: raise ValueError(f"{ruta_delta}: no se encontró la columna de SKU")
+    accion = df['ACCION'].fillna('').str.strip().str.upper() if 'ACCION' in df.columns else pd.Series('', index=df.index)
+    delta = pd.DataFrame({
+        'SKU': df[c_sku],
+        'SKU_CLEAN': limpiar_sku(df[c_sku]),
+        'PRECIO': df[c_precio] if c_precio else None,
+        'DESC': df[c_desc] if c_desc != c_sku else None,
+        'ES_BAJA': accion.isin(BAJAS),
+    })
+    if c_precio:
+        delta['PRECIO_NUM'], _ = parsear_precios(df[c_precio])
+        # Celda de precio vacía = sin cambio de precio (p. ej. delta solo de descripciones), no $0
+        delta.loc[df[c_precio].fillna('').str.strip() == '', 'PRECIO_NUM'] = float('nan')
+    else: delta['PRECIO_NUM'] = None
+    return delta.drop_duplicates(subset=['SKU_CLEAN'], keep='last').reset_index(drop=True)
+
+def aplicar_delta(ruta_delta, ruta_zip=ARCHIVO_ZIP, ruta_cache=ARCHIVO_CACHE):
+    """Aplica cambios/altas/bajas de una lista parcial al cache. Devuelve el resumen.
+
+    No relee el zip: parte del cache vigente (lo construye si hace falta). Si después
+    se reemplaza el zip completo, el cache se reconstruye desde él y los deltas
+    aplicados quedan absorbidos por la lista nueva.
+    """
+    df, c_sku, c_desc, c_precio = cargar_catalogo(ruta_zip, ruta_cache)
+    if df is None: raise ValueError("Sin catálogo base.")
+    meta = _leer_meta_cache(ruta_cache)
+    if not meta: raise ValueError("El catálogo no tiene cache escribible.")
+    delta = leer_delta(ruta_delta)
+    df = _leer_editable(ruta_cache)
+
+    bajas = delta['ES_BAJA']
+    resto = delta[~bajas]
+    pos = pd.Index(df['SKU_CLEAN']).get_indexer(resto['SKU_CLEAN'])
+    cambios, altas = resto[pos >= 0], resto[pos < 0]
+    filas_cambio = pos[pos >= 0]
+    con_precio = cambios['PRECIO_NUM'].notna().to_numpy()
+    df.loc[filas_cambio[con_precio], 'PRECIO_NUM'] = cambios['PRECIO_NUM'].to_numpy()[con_precio]
+    if c_precio in df.columns:  # En modo compacto no se guarda el precio original en texto
+        df.loc[filas_cambio[con_precio], c_precio] = cambios['PRECIO'].to_numpy()[con_precio]
+    # Catálogo sin columna de descripción (c_desc == c_sku): no se toca, sería escribir sobre el SKU
+    con_desc = cambios['DESC'].notna().to_numpy() & (cambios['DESC'].to_numpy() != df[c_desc].to_numpy()[filas_cambio]) & (c_desc != c_sku)
+    if con_desc.any():
+        nuevas = cambios['DESC'][con_desc]
+        df.loc[filas_cambio[con_desc], c_desc] = nuevas.to_numpy()
+        df.loc[filas_cambio[con_desc], 'DESC_ES'] = _desc_es_conocidas(nuevas).to_numpy()
+
+    if len(altas):
+        nuevas = pd.DataFrame({
+            c_sku: altas['SKU'].to_numpy(), c_precio: altas['PRECIO'].to_numpy(), 'SKU_CLEAN': altas['SKU_CLEAN'].to_numpy(),
+            'PRECIO_NUM': altas['PRECIO_NUM'].fillna(0.0).astype('float64').to_numpy(),
+        })
+        if c_desc != c_sku: nuevas[c_desc] = altas['DESC'].fillna('').to_numpy()  # Si no, la llave repetida pisaría el SKU
+        nuevas['DESC_ES'] = _desc_es_conocidas(nuevas[c_desc])
+        df = pd.concat([df, nuevas.reindex(columns=df.columns)], ignore_index=True)
+    quitar = df['SKU_CLEAN'].isin(delta.loc[bajas, 'SKU_CLEAN'])
+    n_bajas = int(quitar.sum())
+    if n_bajas: df = df[~quitar].reset_index(drop=True)
+
+    resumen = {'cambios': len(cambios), 'altas': len(altas), 'bajas': n_bajas, 'descripciones': int(con_desc.sum())}
+    _subir_version(meta, estructura=bool(len(altas) or n_bajas or con_desc.any()))
+    meta['filas'] = len(df)
+    meta.setdefault('deltas', []).append({'archivo': os.path.basename(ruta_delta), 'sha256': _sha256(ruta_delta), 'version': meta['version_datos'], **resumen})
+    _escribir_cache(df, meta, ruta_cache)
+    return {**resumen, 'version': meta['version_datos']}
+
+# ==========================================
+# RECARGA EN CALIENTE
+# ==========================================
+VersionCatalogo = namedtuple('VersionCatalogo', 'firma df c_sku c_desc c_precio indice')
+
+class CatalogoVivo:
+    """Catálogo del proceso que se recarga solo cuando cambia el zip o se aplica un delta.
+
+    `actual` es una VersionCatalogo completa (DataFrame + índice) y se reemplaza de una
+    sola asignación: un rerun nunca ve el catálogo nuevo con el índice viejo. Mientras
+    se arma la versión nueva se sigue sirviendo la anterior; si falla, se queda la anterior.
+    `indexar(df, c_sku, c_desc)` arma lo que cada app necesite (índice de búsqueda, dict, ...).
+
+    `iniciar` calienta en el hilo de fondo: arma la primera versión de inmediato, marca
+    `listo` y luego corre las funciones de `calentar` (p. ej. el cache de traducciones).
+    Mientras `listo` no esté marcado las apps muestran "cargando" en vez de bloquear.
+    """
+    def __init__(self, indexar=None, indice_por_estructura=True, ruta_zip=ARCHIVO_ZIP, ruta_cache=ARCHIVO_CACHE, intervalo=INTERVALO_REVISION, calentar=()):
+        self.indexar = indexar
+        self.calentar = calentar
+        # True: el índice solo depende de filas/descripciones y se reutiliza si un delta solo cambia precios
+        self.indice_por_estructura = indice_por_estructura
+        self.ruta_zip, self.ruta_cache, self.intervalo = ruta_zip, ruta_cache, intervalo
+        self.actual = None
+        self.error = None
+        self.listo = threading.Event()
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def _construir(self, firma):
+        df, c_sku, c_desc, c_precio = cargar_catalogo(self.ruta_zip, self.ruta_cache)
+        if df is None: return VersionCatalogo(firma, None, None, None, None, None)
+        previa = self.actual
+        if (self.indice_por_estructura and previa is not None and previa.df is not None
+                and firma_estructura(previa.firma) == firma_estructura(firma)):
+            indice = previa.indice
+        else:
+            try: indice = self.indexar(df, c_sku, c_desc) if self.indexar else None
+            except MemoryError: indice = None  # La app trabaja sin índice
+        return VersionCatalogo(firma, df, c_sku, c_desc, c_precio, indice)
+
+    def revisar(self):
+        """Arma y publica una versión nueva si cambió la firma. Devuelve True si la hubo."""
+        with self._lock:
+            firma = firma_catalogo(self.ruta_zip, self.ruta_cache)
+            if self.actual is not None and firma == self.actual.firma: return False
+            try:
+                self.actual = self._construir(firma)
+                self.error = None
+            except Exception as e:
+                self.error = e
+                return False
+            return True
+
+    def _vigilar(self):
+        self.revisar()
+        self.listo.set()
+        for funcion in self.calentar:
+            try: funcion()
+            except Exception: pass  # Calentar es opcional: lo que falle se carga al usarse
+        while True:
+            time.sleep(self.intervalo)
+            self.revisar()
+
+    def iniciar(self):
+        """Arranca (una vez) el hilo de fondo que arma la primera versión y luego vigila el zip y el cache."""
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._vigilar, name="recarga-catalogo", daemon=True)
+                self._hilo.start()
+        return self
+
+    def vigente(self):
+        """Versión vigente sin esperar; vacía mientras el hilo arma la primera."""
+        return self.actual or VersionCatalogo(None, None, None, None, None, None)
+
+    def obtener(self):
+        """Versión vigente. Solo la primera vez (sin versión aún) se arma en el hilo que llama."""
+        if self.actual is None: self.revisar()
+        return self.vigente()
+
+# ==========================================
+# REPORTE DE MEMORIA
+# ==========================================
+def uso_memoria():
+    """RSS del proceso en MB: privado (heap, por sesión/worker) y compartido (archivos mapeados)."""
+    uso = {}
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith(('RssAnon:', 'RssFile:')):
+                    clave, kb = linea.split()[:2]
+                    uso['privado_mb' if clave == 'RssAnon:' else 'compartido_mb'] = int(kb) / 1024
+    except OSError:
+        import resource
+        uso['privado_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return uso
+
+def _reporte_memoria(ruta_zip, ruta_cache):
+    df_mapeado, *_ = cargar_catalogo(ruta_zip, ruta_cache)
+    if df_mapeado is None:
+        print(f"No se pudo cargar {ruta_zip}"); return
+    del df_mapeado
+    base = uso_memoria()
+    df_mapeado = abrir_mapeado(ruta_cache)
+    mapeado = uso_memoria()
+    df_copia = construir_catalogo(ruta_zip)[0]  # Como antes: todas las columnas, objetos str en el heap
+    copia = uso_memoria()
+    mb = lambda df: df.memory_usage(deep=True).sum() / 2**20
+    print(f"Filas: {len(df_copia):,}")
+    print(f"Antes: pandas dtype=str ({len(df_copia.columns)} columnas) : {mb(df_copia):8.1f} MB por worker "
+          f"(+{copia.get('privado_mb', 0) - mapeado.get('privado_mb', 0):.1f} MB RSS privado)")
+    print(f"Compacto memory-map ({len(df_mapeado.columns)} columnas)  : {mb(df_mapeado):8.1f} MB "
+          f"(+{mapeado.get('privado_mb', 0) - base.get('privado_mb', 0):.1f} MB RSS privado, "
+          f"+{mapeado.get('compartido_mb', 0) - base.get('compartido_mb', 0):.1f} MB compartidos)")
+    print(f"Reducción: x{mb(df_copia) / max(mb(df_mapeado), 1e-9):.1f}   Archivo: {os.path.getsize(ruta_cache) / 2**20:.1f} MB")
+    for columna, tipo in df_mapeado.dtypes.items(): print(f"   {columna:20s} {tipo}")
+    del df_mapeado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Utilidades del catálogo de refacciones")
+    parser.add_argument("--zip", default=ARCHIVO_ZIP)
+    parser.add_argument("--cache", default=ARCHIVO_CACHE)
+    parser.add_argument("--memoria", action="store_true", help="Comparar memoria: pandas dtype=str vs catálogo compacto mapeado")
+    parser.add_argument("--delta", action="append", default=[], help="Lista parcial de precios (xlsx/csv) a aplicar; se puede repetir")
+    args = parser.parse_args()
+    if args.memoria:
+        _reporte_memoria(args.zip, args.cache)
+    elif args.delta:
+        for ruta in args.delta:
+            r = aplicar_delta(ruta, args.zip, args.cache)
+            print(f"{ruta}: {r['cambios']:,} cambios ({r['descripciones']:,} descripciones), {r['altas']:,} altas, "
+                  f"{r['bajas']:,} bajas -> versión {r['version']}")
+    else:
+        df, c_sku, c_desc, c_precio = cargar_catalogo(args.zip, args.cache)
+        if df is None: print("Sin catálogo.")
+        else:
+            meta = _leer_meta_cache(args.cache) or {}
+            print(f"{len(df):,} filas -> {args.cache} (SKU={c_sku}, DESC={c_desc}, PRECIO={c_precio})")
+            print(f"Precios no interpretables (quedaron en 0.0): {meta.get('precios_fallidos', 'N/D')}")
@@ -1,10 +1,11 @@
 import streamlit as st
-import pandas as pd
 import os
-import zipfile
+import catalogo
+import codigos
+import cotizacion
 from datetime import datetime
-# Librería para la traducción automática (NOM-050)
-from deep_translator import GoogleTranslator
+# Traducción automática con cache persistente (NOM-050)
+import traduccion
 import pytz
 
 # Configuración de página
@@ -173,28 +174,28 @@ def apply_dynamic_styles():
 apply_dynamic_styles()
 
 # --- 2. CARGA DE DATOS ---
-@st.cache_data
-def cargar_catalogo():
-    archivo_objetivo = "base_datos_2026.zip"
-    if not os.path.exists(archivo_objetivo):
-        st.error(f"⚠️ Falta archivo: {archivo_objetivo}")
-        return None
-    try:
-        with zipfile.ZipFile(archivo_objetivo, "r") as z:
-            archivos = [f for f in z.namelist() if f.endswith('.xlsx')]
-            if not archivos: return None
-            with z.open(archivos[0]) as f:
-                df = pd.read_excel(f, dtype=str)
-        df.dropna(how='all', inplace=True)
-        df.columns = [c.strip().upper() for c in df.columns]
-        cols_sku = [c for c in df.columns if 'ITEM' in c or 'PART' in c or 'SKU' in c or 'NUMERO' in c]
-        if cols_sku:
-            df['SKU_CLEAN'] = df[cols_sku[0]].astype(str).str.replace('-', '').str.replace(' ', '').str.strip().str.upper()
-            return df
-        return None
-    except: return None
+# Índice SKU_CLEAN -> (sku, descripción, descripción pretraducida, precio): una sola consulta hash por búsqueda
+def indexar_por_sku(df, c_sku, c_desc):
+    desc_es = df['DESC_ES'] if 'DESC_ES' in df.columns else [None] * len(df)
+    return dict(zip(df['SKU_CLEAN'], zip(df[c_sku], df[c_desc], desc_es, df['PRECIO_NUM'])))
 
-df = cargar_catalogo()
+# Un catálogo por proceso: un hilo de fondo lo arma sin bloquear la primera sesión (y calienta
+# las traducciones); después revisa el zip y los deltas y publica la versión
+# nueva (con su índice) fuera del request; el índice trae precios, así que se rearma en cada versión.
+@st.cache_resource
+def catalogo_vivo():
+    return catalogo.CatalogoVivo(indexar=indexar_por_sku, indice_por_estructura=False, calentar=[traduccion.calentar]).iniciar()
+
+# Mientras el hilo de fondo arma el catálogo el kiosco muestra "cargando" y se recarga solo al estar listo
+@st.fragment(run_every=2)
+def aviso_catalogo_cargando():
+    if catalogo_vivo().listo.is_set(): st.rerun()
+    st.markdown("<div class='big-price' style='font-size: 28px;'>⏳ Preparando precios...</div>", unsafe_allow_html=True)
+    st.markdown("<div style='text-align: center; font-weight: bold;'>El verificador estará listo en unos segundos.</div>", unsafe_allow_html=True)
+
+listo_sku = catalogo_vivo().listo.is_set()
+indice_sku = catalogo_vivo().vigente().indice
+if listo_sku and indice_sku is None: st.error(f"⚠️ Falta archivo: {catalogo.ARCHIVO_ZIP}")
 fecha_actual = obtener_hora_mx()
 
 # --- 3. INTERFAZ ---
@@ -219,38 +220,34 @@ st.markdown("---")
 # --- 4. BUSCADOR ---
 st.markdown("<h3 style='text-align: center; font-weight: 800;'>VERIFICADOR DE PRECIOS</h3>", unsafe_allow_html=True)
 
+if not listo_sku:
+    aviso_catalogo_cargando()
+    st.stop()
+
 busqueda_input = st.text_input("Ingresa SKU:", placeholder="Ej. 90915-YZZD1", label_visibility="collapsed").strip()
 boton_consultar = st.button("🔍 CONSULTAR PRECIO")
 
+# Escaneo de la etiqueta: el código leído va directo a la consulta (si no se escribió un SKU)
+if st.toggle("📷 ESCANEAR ETIQUETA"):
+    foto = st.camera_input("Escanear etiqueta", label_visibility="collapsed")
+    if foto is not None and not busqueda_input:
+        codigo = codigos.decodificar(foto.getvalue())
+        if codigo: busqueda_input = (codigos.buscar_en_indice(codigo, indice_sku) if indice_sku else None) or codigo
+        else: st.warning("No se pudo leer el código. Acerca la etiqueta a la cámara e intenta de nuevo.")
+
 # --- 5. RESULTADOS ---
-if (busqueda_input or boton_consultar) and df is not None:
+if (busqueda_input or boton_consultar) and indice_sku is not None:
     busqueda_clean = busqueda_input.upper().replace('-', '').replace(' ', '')
-    mask = df['SKU_CLEAN'] == busqueda_clean
-    resultados = df[mask]
+    registro = indice_sku.get(busqueda_clean)
 
-    if not resultados.empty:
-        row = resultados.iloc[0]
-        
-        c_sku = [c for c in df.columns if 'ITEM' in c or 'PART' in c or 'SKU' in c or 'NUMERO' in c][0]
-        c_desc_list = [c for c in df.columns if 'DESC' in c]
-        c_desc = c_desc_list[0] if c_desc_list else c_sku
-        c_precio_list = [c for c in df.columns if 'TOTAL' in c or 'UNITARIO' in c or 'PRICE' in c or 'PRECIO' in c or 'IMPORTE' in c]
-        
-        sku_val = row[c_sku]
-        desc_original = row[c_desc]
+    if registro is not None:
+        sku_val, desc_original, desc_es, precio_base = registro
         
-        # Traducción
-        try:
-            desc_es = GoogleTranslator(source='auto', target='es').translate(desc_original)
-        except:
-            desc_es = desc_original
+        # Traducción (pretraducida en el catálogo o vía cache)
+        if not isinstance(desc_es, str) or not desc_es.strip():
+            desc_es = traduccion.traducir(desc_original, origen='auto')
 
-        precio_final = 0.0
-        if c_precio_list:
-            try:
-                p_text = str(row[c_precio_list[0]]).replace(',', '').replace('$', '').strip()
-                precio_final = float(p_text) * 1.16 
-            except: pass
+        precio_final = float(precio_base) * (1 + cotizacion.IVA) if precio_base else 0.0
 
         # Resultados con clases de alto contraste
         st.markdown(f"<div class='sku-display' style='text-align: center; margin-top: 20px;'>{sku_val}</div>", unsafe_allow_html=True)
@@ -0,0 +1,52 @@
+"""Lectura de códigos de barras / QR de etiquetas de refacciones (verificador de precios).
+
+Se decodifica sobre versiones reducidas en escala de grises, de la más chica a la
+más grande, y se para en el primer código leído: una etiqueta normal sale en la
+primera escala (decenas de ms) y solo las fotos lejanas llegan al tamaño completo.
+
+    python codigos.py foto.jpg      # código leído y tiempo
+"""
+import io
+import re
+import time
+
+from PIL import Image
+
+ESCALAS = (640, 1024, 1600)
+
+def _grises(datos, lado):
+    imagen = Image.open(io.BytesIO(datos))
+    imagen.draft('L', (lado, lado))  # JPEG: decodifica ya reducido (mucho más rápido)
+    imagen = imagen.convert('L')
+    imagen.thumbnail((lado, lado))
+    return imagen
+
+def decodificar(datos):
+    """Texto del primer código de barras/QR encontrado en la imagen, o None."""
+    from pyzbar import pyzbar
+    for lado in ESCALAS:
+        imagen = _grises(datos, lado)
+        codigos = pyzbar.decode(imagen)
+        if codigos: return codigos[0].data.decode('utf-8', errors='ignore').strip()
+        if max(imagen.size) < lado: break  # La imagen ya está en su tamaño original
+    return None
+
+def buscar_en_indice(codigo, indice_sku):
+    """SKU_CLEAN del catálogo que corresponde al código leído, o None.
+
+    Primero el código completo; si la etiqueta trae más datos (p. ej. 'PN:90915-YZZD1 QTY:1'),
+    cada fragmento alfanumérico.
+    """
+    completo = codigo.upper().replace('-', '').replace(' ', '')
+    if completo in indice_sku: return completo
+    for fragmento in re.split(r'[^A-Z0-9\-]+', codigo.upper()):
+        fragmento = fragmento.replace('-', '')
+        if fragmento in indice_sku: return fragmento
+    return None
+
+if __name__ == "__main__":
+    import sys
+    for ruta in sys.argv[1:]:
+        with open(ruta, 'rb') as f: datos = f.read()
+        t0 = time.perf_counter(); codigo = decodificar(datos)
+        print(f"{ruta}: {codigo!r} en {(time.perf_counter() - t0) * 1000:.0f} ms")
@@ -0,0 +1,168 @@
+"""Modelo del carrito: partidas tipadas con dinero en centavos y totales al día.
+
+`LineaCotizacion` (dataclass con slots) reemplaza al dict de 13 llaves con textos de
+pantalla ("Precio Unitario (c/IVA)", ...). El dinero va en centavos enteros, y
+Prioridad / Abasto / Tipo son enums. `Cotizacion` guarda las partidas y actualiza
+los subtotales por grupo (cada prioridad de refacciones, y mano de obra) en cada
+alta, baja o cambio. Carrito, vista previa, PDF y WhatsApp leen los totales sin
+volver a filtrar la lista.
+
+El JSON de sesión no cambia de formato (`a_dict` / `desde_dict`): las sesiones ya
+guardadas cargan igual y el modo por lote de cotizacion_pdf las sigue leyendo.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+
+IVA = 0.16
+
+class Prioridad(Enum):
+    URGENTE = 'Urgente'
+    MEDIO = 'Medio'
+    BAJO = 'Bajo'
+
+class Abasto(Enum):
+    DISPONIBLE = 'Disponible'
+    PEDIDO = 'Pedido'
+    BACK_ORDER = 'Back Order'
+    REVISAR = 'REVISAR'
+
+    @classmethod
+    def desde_texto(cls, texto):
+        """Acepta las variantes guardadas ('⚠️ REVISAR', '📦 Pedido', 'Back Order'...)."""
+        texto = str(texto)
+        if "Disponible" in texto: return cls.DISPONIBLE
+        if "Pedido" in texto: return cls.PEDIDO
+        if "Back" in texto: return cls.BACK_ORDER
+        return cls.REVISAR
+
+class Tipo(Enum):
+    REFACCION = 'Refacción'
+    MANO_OBRA = 'Mano de Obra'
+
+# Grupos en el orden en que se presentan: refacciones por prioridad y al final mano de obra
+GRUPOS = (Prioridad.URGENTE, Prioridad.MEDIO, Prioridad.BAJO, Tipo.MANO_OBRA)
+
+def a_centavos(pesos):
+    return int(round(float(pesos) * 100))
+
+def a_pesos(centavos):
+    return centavos / 100
+
+# ==========================================
+# PARTIDA
+# ==========================================
+@dataclass(slots=True)
+class LineaCotizacion:
+    sku: str
+    descripcion: str
+    precio_base: int  # Centavos, sin IVA
+    cantidad: int = 1
+    tipo: Tipo = Tipo.REFACCION
+    prioridad: Prioridad = Prioridad.MEDIO
+    abasto: Abasto = Abasto.REVISAR
+    tiempo_entrega: str = ""
+    seleccionado: bool = True
+
+    @property
+    def subtotal(self): return self.precio_base * self.cantidad
+
+    @property
+    def iva(self): return round(self.subtotal * IVA)
+
+    @property
+    def importe(self): return self.subtotal + self.iva
+
+    @property
+    def unitario_con_iva(self): return round(self.precio_base * (1 + IVA))
+
+    @property
+    def grupo(self): return Tipo.MANO_OBRA if self.tipo is Tipo.MANO_OBRA else self.prioridad
+
+    def a_dict(self):
+        """Dict con las llaves de siempre (pesos en float) para el JSON de sesión."""
+        return {
+            "SKU": self.sku, "Descripción": self.descripcion, "Prioridad": self.prioridad.value, "Abasto": self.abasto.value,
+            "Tiempo Entrega": self.tiempo_entrega, "Cantidad": self.cantidad, "Precio Base": a_pesos(self.precio_base),
+            "Precio Unitario (c/IVA)": a_pesos(self.unitario_con_iva), "IVA": a_pesos(self.iva), "Importe Total": a_pesos(self.importe),
+            "Estatus": "Disponible", "Tipo": self.tipo.value, "Seleccionado": self.seleccionado,
+        }
+
+    @classmethod
+    def desde_dict(cls, d):
+        return cls(
+            sku=str(d['SKU']), descripcion=str(d['Descripción']), precio_base=a_centavos(d['Precio Base']),
+            cantidad=int(d.get('Cantidad', 1)), tipo=Tipo(d.get('Tipo', Tipo.REFACCION.value)),
+            prioridad=Prioridad(d.get('Prioridad', Prioridad.MEDIO.value)), abasto=Abasto.desde_texto(d.get('Abasto', '')),
+            tiempo_entrega=str(d.get('Tiempo Entrega', "")), seleccionado=bool(d.get('Seleccionado', True)),
+        )
+
+# ==========================================
+# CARRITO CON SUBTOTALES INCREMENTALES
+# ==========================================
+class Cotizacion:
+    """Partidas en orden de captura + importes y conteos de las partidas seleccionadas por grupo.
+
+    Toda modificación pasa por `agregar` / `quitar` / `modificar`, que restan la
+    aportación vieja de la partida y suman la nueva.
+    """
+    __slots__ = ('lineas', '_importes', '_partidas', '_abasto')
+
+    def __init__(self, lineas=()):
+        self.lineas = []
+        self._importes = dict.fromkeys(GRUPOS, 0)
+        self._partidas = dict.fromkeys(GRUPOS, 0)
+        self._abasto = Counter()  # Partidas seleccionadas por abasto (solo refacciones)
+        for linea in lineas: self.agregar(linea)
+
+    def _aportar(self, linea, signo):
+        if not linea.seleccionado: return
+        self._importes[linea.grupo] += signo * linea.importe
+        self._partidas[linea.grupo] += signo
+        if linea.tipo is Tipo.REFACCION: self._abasto[linea.abasto] += signo
+
+    def agregar(self, linea):
+        self.lineas.append(linea); self._aportar(linea, 1)
+
+    def quitar(self, idx):
+        linea = self.lineas.pop(idx); self._aportar(linea, -1)
+        return linea
+
+    def modificar(self, idx, **cambios):
+        """Cambia campos de la partida `idx` (cantidad=3, abasto=Abasto.PEDIDO, seleccionado=False...)."""
+        linea = self.lineas[idx]
+        self._aportar(linea, -1)
+        for campo, valor in cambios.items(): setattr(linea, campo, valor)
+        self._aportar(linea, 1)
+
+    def __len__(self): return len(self.lineas)
+    def __iter__(self): return iter(self.lineas)
+
+    # --- Consultas (sin recorrer el carrito) ---
+    def subtotal(self, grupo): return self._importes[grupo]
+    def partidas(self, grupo): return self._partidas[grupo]
+    @property
+    def total(self): return sum(self._importes.values())
+    @property
+    def activas(self): return sum(self._partidas.values())
+    @property
+    def pendientes(self): return self._abasto[Abasto.REVISAR]
+    @property
+    def hay_pedido(self): return self._abasto[Abasto.PEDIDO] + self._abasto[Abasto.BACK_ORDER] > 0
+    @property
+    def hay_backorder(self): return self._abasto[Abasto.BACK_ORDER] > 0
+
+    def por_grupo(self):
+        """[(grupo, partidas seleccionadas)] de los grupos con partidas, en el orden de GRUPOS (una pasada)."""
+        grupos = {g: [] for g in GRUPOS if self._partidas[g]}
+        for linea in self.lineas:
+            if linea.seleccionado: grupos[linea.grupo].append(linea)
+        return list(grupos.items())
+
+    # --- JSON de sesión ---
+    def a_dicts(self, solo_seleccionadas=False):
+        return [l.a_dict() for l in self.lineas if l.seleccionado or not solo_seleccionadas]
+
+    @classmethod
+    def desde_dicts(cls, dicts):
+        return cls(LineaCotizacion.desde_dict(d) for d in dicts)
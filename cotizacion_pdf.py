@@ -0,0 +1,160 @@
+"""PDF de cotización a partir de una cotización plana (sin st.session_state).
+
+La cotización es el mismo dict que guarda "GUARDAR SESIÓN ACTUAL" en tokenization.py
+(carrito, cliente, vin, orden, asesor; el carrito como lista de dicts o como
+cotizacion.Cotizacion), así que sirve igual para la app y para el
+modo por lote: a fin de mes se vuelven a emitir las cotizaciones de docenas de
+órdenes guardadas, repartidas en un ProcessPoolExecutor.
+
+    python cotizacion_pdf.py sesiones/ -o pdfs/ --procesos 4
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytz
+
+import cotizacion as modelo
+import plantilla_pdf
+import tabla_pdf
+
+PROCESOS_LOTE = min(4, os.cpu_count() or 1)
+COLOR_PRIORIDAD_PDF = {modelo.Prioridad.URGENTE: (211, 47, 47), modelo.Prioridad.MEDIO: (25, 118, 210), modelo.Prioridad.BAJO: (117, 117, 117)}
+COLOR_ABASTO_PDF = {
+    modelo.Abasto.DISPONIBLE: ((200, 230, 201), None), modelo.Abasto.PEDIDO: ((255, 224, 178), None),
+    modelo.Abasto.BACK_ORDER: ((33, 33, 33), (255, 255, 255)), modelo.Abasto.REVISAR: ((255, 205, 210), None),
+}
+COLUMNAS_PDF = tabla_pdf.Columnas(
+    anchos=[20, 55, 18, 25, 10, 20, 17, 20],
+    encabezados=['CÓDIGO', 'DESCRIPCIÓN', 'ESTATUS', 'T.ENTREGA', 'CANT', 'UNITARIO', 'IVA', 'TOTAL'],
+    alineacion=['C', 'L', 'C', 'C', 'C', 'R', 'R', 'R'], ajustar=1)
+
+def fecha_hoy():
+    """dd/mm/aaaa en la hora de la Ciudad de México (la misma que imprime la app)."""
+    return datetime.now(pytz.timezone('America/Mexico_City')).strftime("%d/%m/%Y")
+
+def _latin1(texto):
+    return str(texto).encode('latin-1', 'replace').decode('latin-1')
+
+# ==========================================
+# FILAS Y SUBTOTALES
+# ==========================================
+def fila_pdf(linea):
+    importes = [f"${modelo.a_pesos(linea.precio_base):,.2f}", f"${modelo.a_pesos(linea.iva) / linea.cantidad:,.2f}", f"${modelo.a_pesos(linea.importe):,.2f}"]
+    if linea.tipo is modelo.Tipo.MANO_OBRA:
+        return tabla_pdf.Fila([linea.sku[:15], _latin1(linea.descripcion), "SERVICIO", "-", "1"] + importes, {2: ((230, 230, 230), None)})
+    return tabla_pdf.Fila([linea.sku[:15], _latin1(linea.descripcion), linea.abasto.value, linea.tiempo_entrega[:12], str(linea.cantidad)] + importes,
+                          {2: COLOR_ABASTO_PDF[linea.abasto]})
+
+def subtotal_pdf(pdf, etiqueta, centavos):
+    pdf.set_font('Arial', 'B', 8)
+    pdf.cell(165, 5, etiqueta, 0, 0, 'R')
+    pdf.cell(20, 5, f"${modelo.a_pesos(centavos):,.2f}", 1, 1, 'R')
+
+# ==========================================
+# DOCUMENTO
+# ==========================================
+def generar_pdf(cotizacion, fecha=None):
+    """Bytes del PDF de una cotización (dict con carrito, cliente, vin, orden)."""
+    pdf = plantilla_pdf.PlantillaPDF()  # Membrete, logo y pie legal ya maquetados
+    pdf.set_auto_page_break(auto=True, margin=80)
+    pdf.add_page(); y_pagina = pdf.get_y()  # Donde empieza el contenido, debajo del membrete
+    cli_safe = _latin1(cotizacion.get('cliente', ""))
+    vin_safe = _latin1(cotizacion.get('vin', ""))
+    ord_safe = _latin1(cotizacion.get('orden', ""))
+    pdf.set_text_color(0,0,0); pdf.set_font('Arial', 'B', 10)
+    pdf.cell(20, 5, 'CLIENTE:', 0, 0); pdf.set_font('Arial', '', 10); pdf.cell(100, 5, cli_safe[:60], 0, 0)
+    pdf.set_font('Arial', 'B', 10); pdf.cell(20, 5, 'FECHA:', 0, 0); pdf.set_font('Arial', '', 10); pdf.cell(40, 5, fecha or fecha_hoy(), 0, 1)
+    pdf.cell(20, 5, 'VIN:', 0, 0); pdf.cell(100, 5, vin_safe, 0, 0)
+    pdf.cell(20, 5, 'ORDEN:', 0, 0); pdf.cell(40, 5, ord_safe, 0, 1)
+    pdf.ln(5)
+    carrito = cotizacion.get('carrito', [])
+    if not isinstance(carrito, modelo.Cotizacion): carrito = modelo.Cotizacion.desde_dicts(carrito)
+
+    for grupo, lineas in carrito.por_grupo():
+        if grupo is modelo.Tipo.MANO_OBRA:
+            pdf.ln(4)
+            tabla_pdf.dibujar_seccion(pdf, " MANO DE OBRA / SERVICIOS ", (50, 50, 50), COLUMNAS_PDF, [fila_pdf(l) for l in lineas], y_pagina)
+            subtotal_pdf(pdf, "SUBTOTAL MANO DE OBRA:", carrito.subtotal(grupo))
+        else:
+            prio = grupo.value.upper()
+            pdf.ln(2)
+            tabla_pdf.dibujar_seccion(pdf, f" REFACCIONES - {prio} ", COLOR_PRIORIDAD_PDF[grupo], COLUMNAS_PDF, [fila_pdf(l) for l in lineas], y_pagina)
+            subtotal_pdf(pdf, f"SUBTOTAL REFACCIONES ({prio}):", carrito.subtotal(grupo))
+
+    pdf.ln(5)
+    if carrito.hay_pedido:
+        pdf.set_text_color(230, 81, 0); pdf.set_font('Arial', 'B', 9)
+        pdf.cell(0, 4, "** REQUIERE ANTICIPO DEL 100% POR PIEZAS DE PEDIDO **", 0, 1, 'R')
+    if carrito.hay_backorder:
+        pdf.set_text_color(183, 28, 28); pdf.set_font('Arial', 'B', 9)
+        pdf.cell(0, 4, "(!) REFACCIONES EN BACK ORDER: CONSULTAR TIEMPO DE ESPERA CON ASESOR", 0, 1, 'R')
+    pdf.ln(5); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', 'B', 14)
+    pdf.cell(145, 10, 'GRAN TOTAL (IVA INCLUIDO):', 0, 0, 'R')
+    pdf.cell(45, 10, f"${modelo.a_pesos(carrito.total):,.2f}", 0, 1, 'R')
+    return pdf.output(dest='S').encode('latin-1')
+
+# ==========================================
+# MODO POR LOTE
+# ==========================================
+def _emitir(ruta, carpeta_salida, fecha):
+    """(archivo JSON, PDF escrito o None, segundos, error) de una sesión guardada; corre en un proceso del pool."""
+    t0 = time.perf_counter()
+    try:
+        with open(ruta, encoding='utf-8') as f: cotizacion = json.load(f)
+        # Con el nombre del JSON: dos sesiones de la misma orden (o sin orden) no se pisan
+        partes = [str(cotizacion.get('orden') or ''), os.path.splitext(os.path.basename(ruta))[0]]
+        nombre = "Cot_" + "_".join(re.sub(r'[^0-9A-Za-z_-]+', '_', p) for p in partes if p) + ".pdf"
+        datos = generar_pdf(cotizacion, fecha)
+        salida = os.path.join(carpeta_salida, nombre)
+        with open(salida, 'wb') as f: f.write(datos)
+        return ruta, salida, time.perf_counter() - t0, None
+    except Exception as e:
+        return ruta, None, time.perf_counter() - t0, str(e)
+
+def _percentil(valores, p):
+    if not valores: return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def generar_lote(carpeta, carpeta_salida, procesos=PROCESOS_LOTE, fecha=None):
+    """PDF de cada *.json de `carpeta` en `carpeta_salida`; devuelve resultados y estadísticas.
+
+    Cada proceso arma su plantilla (logo, membrete y pie) una vez y la reutiliza en
+    todas las cotizaciones que le tocan.
+    """
+    rutas = sorted(os.path.join(carpeta, n) for n in os.listdir(carpeta) if n.lower().endswith('.json'))
+    os.makedirs(carpeta_salida, exist_ok=True)
+    fecha = fecha or fecha_hoy()
+    t0 = time.perf_counter()
+    if procesos > 1 and len(rutas) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(rutas))) as ex:
+            resultados = list(ex.map(_emitir, rutas, [carpeta_salida] * len(rutas), [fecha] * len(rutas)))
+    else:
+        resultados = [_emitir(r, carpeta_salida, fecha) for r in rutas]
+    total = time.perf_counter() - t0
+    tiempos = [r[2] for r in resultados if r[3] is None]
+    estadisticas = {
+        'cotizaciones': len(tiempos), 'errores': len(resultados) - len(tiempos), 'segundos': total,
+        'por_segundo': len(tiempos) / total if total else 0.0,
+        'p50_ms': _percentil(tiempos, 50) * 1000, 'p95_ms': _percentil(tiempos, 95) * 1000,
+    }
+    return resultados, estadisticas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emitir por lote los PDF de sesiones guardadas (JSON de GUARDAR SESIÓN ACTUAL)")
+    parser.add_argument("carpeta", help="Carpeta con los .json de sesión")
+    parser.add_argument("-o", "--salida", default="pdfs", help="Carpeta de salida")
+    parser.add_argument("--procesos", type=int, default=PROCESOS_LOTE)
+    parser.add_argument("--fecha", default=None, help="Fecha impresa (dd/mm/aaaa); por defecto hoy")
+    args = parser.parse_args()
+
+    resultados, est = generar_lote(args.carpeta, args.salida, args.procesos, args.fecha)
+    for ruta, _, _, error in resultados:
+        if error: print(f"   ERROR {ruta}: {error}")
+    print(f"{est['cotizaciones']} cotizaciones ({est['errores']} errores) en {est['segundos']:.2f} s con {args.procesos} procesos: "
+          f"{est['por_segundo']:.1f} cotizaciones/s, p50 {est['p50_ms']:.0f} ms, p95 {est['p95_ms']:.0f} ms -> {args.salida}")
@@ -0,0 +1,272 @@
+"""Detección de SKUs, VIN, orden, asesor y cliente en archivos de órdenes de reparación.
+
+Versión vectorizada de `analizador_inteligente_archivos`: todas las celdas se aplanan
+(fila por fila) en una sola Series y se evalúan con `str.contains`/`str.match` de una
+vez; la celda de la derecha de cada celda sale de desplazar el arreglo una columna.
+Solo las celdas que resultan ser SKU se recorren en Python para leer su cantidad.
+
+- `analizar_archivo`: variante de tokenization.py (SKU flexible, VIN, orden).
+- `analizar_archivo_detallado`: variante de pruebas.py (además asesor y cliente por
+  palabra clave, con respaldo de la celda derecha).
+
+El resultado es idéntico al recorrido con iterrows original (ver benchmark_importador.py).
+"""
+import io
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+import catalogo
+
+PATRON_VIN = re.compile(r'\b[A-HJ-NPR-Z0-9]{17}\b')
+PATRON_ORDEN = re.compile(r'\b\d{8}\b')
+PATRON_SKU_FLEX = re.compile(r'\b[A-Z0-9]{5}-?[A-Z0-9]{5}(?:-?[A-Z0-9]{2})?\b')
+PATRON_SKU_FMT = re.compile(r'\b[A-Z0-9]{5}-[A-Z0-9]{5}\b')
+PATRON_SKU_PLN = re.compile(r'\b[A-Z0-9]{10,12}\b')
+PALABRAS_CLAVE = {
+    'ORDEN': ['ORDEN', 'FOLIO', 'OT', 'OS'],
+    'ASESOR': ['ASESOR', 'SA', 'ATENDIO', 'ADVISOR'],
+    'CLIENTE': ['CLIENTE', 'ATTN', 'NOMBRE'],
+}
+PATRON_ETIQUETA_ASESOR = re.compile(r'(?:ASESOR|SA|ATENDIO|ADVISOR)[\:\.\-\s]*')
+PATRON_ETIQUETA_CLIENTE = re.compile(r'(?:CLIENTE|ATTN|NOMBRE)[\:\.\-\s]*')
+HOJA_PREFERIDA = 'RESUMEN_DATOS'
+MAX_FILAS_IMPORTACION = 20000
+TAMANO_BLOQUE = 2000
+PROCESOS_PDF = min(4, os.cpu_count() or 1)
+# Sin fork: el proceso de Streamlit tiene hilos (y locks tomados) que no deben copiarse a los hijos
+CONTEXTO_PDF = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# ==========================================
+# UTILERÍAS
+# ==========================================
+def _celdas(df):
+    """(celdas, vecinos): celdas aplanadas fila por fila y la celda a su derecha (None en la última columna)."""
+    # Con pandas >= 3 astype(str) conserva los NaN; '' se comporta igual que el 'NAN' de pandas 2
+    arr = df.fillna('').to_numpy(dtype=object)
+    vecinos = np.full(arr.shape, None, dtype=object)
+    vecinos[:, :-1] = arr[:, 1:]
+    return pd.Series(arr.ravel(), dtype=object), pd.Series(vecinos.ravel(), dtype=object)
+
+def _primera(mask):
+    pos = np.flatnonzero(mask.to_numpy(dtype=bool))
+    return int(pos[0]) if len(pos) else None
+
+def _cantidad(vecino, quitar_espacios):
+    if vecino is None: return 1
+    vecino = vecino.replace('.0', '')
+    if quitar_espacios: vecino = vecino.strip()
+    if vecino.isdigit():
+        try: return int(vecino)
+        except ValueError: pass  # Dígitos unicode ('²') que int() no acepta
+    return 1
+
+def _metadata(encontrados):
+    # Mismo orden de inserción que el recorrido original: por celda y, dentro de la celda, por clave
+    return {clave: valor for _, _, clave, valor in sorted(encontrados)}
+
+def _por_etiqueta(celdas, vecinos, palabras, patron_etiqueta, sin_digitos):
+    """Primera celda con palabra clave cuyo texto sin la etiqueta (o la celda derecha) sirve como valor."""
+    candidatas = celdas[celdas.str.contains('|'.join(palabras))]
+    if candidatas.empty: return None
+    contenido = candidatas.str.replace(patron_etiqueta.pattern, '', regex=True).str.strip()
+    vecino = vecinos[candidatas.index]
+    hay_vecino = vecino.notna()
+    vecino = vecino.fillna('').str.strip()
+    ok_contenido = contenido.str.len() > 4
+    ok_vecino = hay_vecino & (vecino.str.len() > 4)
+    if sin_digitos:
+        ok_contenido &= ~contenido.str.contains(r'\d')
+        ok_vecino &= ~vecino.str.contains(r'\d')
+    i = _primera(ok_contenido | ok_vecino)
+    if i is None: return None
+    return int(candidatas.index[i]), (contenido.iat[i] if ok_contenido.iat[i] else vecino.iat[i])
+
+# ==========================================
+# ANALIZADORES
+# ==========================================
+def analizar_archivo(df_raw):
+    """Variante tokenization.py. Devuelve (hallazgos [{'sku', 'cant'}], metadata {'VIN', 'ORDEN'})."""
+    df = df_raw.fillna('').astype(str).apply(lambda x: x.str.upper().str.strip())
+    if df.size == 0: return [], {}
+    celdas, vecinos = _celdas(df)
+
+    encontrados = []
+    for prioridad, (clave, patron) in enumerate((('VIN', PATRON_VIN), ('ORDEN', PATRON_ORDEN))):
+        i = _primera(celdas.str.contains(patron.pattern))
+        if i is not None: encontrados.append((i, prioridad, clave, patron.search(celdas.iat[i]).group(0)))
+
+    # Una celda igual al VIN (17 caracteres) nunca pasa el filtro de longitud 10/12
+    es_sku = celdas.str.match(PATRON_SKU_FLEX.pattern) & celdas.str.replace('-', '', regex=False).str.len().isin([10, 12])
+    hallazgos = [{'sku': celdas.iat[i], 'cant': _cantidad(vecinos.iat[i], True)} for i in np.flatnonzero(es_sku.to_numpy(dtype=bool))]
+    return hallazgos, _metadata(encontrados)
+
+def analizar_archivo_detallado(df_raw):
+    """Variante pruebas.py. Devuelve (hallazgos, metadata {'VIN', 'ORDEN', 'ASESOR', 'CLIENTE'})."""
+    df = df_raw.astype(str).apply(lambda x: x.str.upper().str.strip())
+    if df.size == 0: return [], {}
+    celdas, vecinos = _celdas(df)
+    encontrados = []
+
+    i = _primera(celdas.str.contains(PATRON_VIN.pattern))
+    if i is not None: encontrados.append((i, 0, 'VIN', PATRON_VIN.search(celdas.iat[i]).group(0)))
+
+    # ORDEN: celda con palabra clave y 8 dígitos en ella o en la celda derecha
+    con_orden = celdas.str.contains(PATRON_ORDEN.pattern)
+    vecino_con_orden = vecinos.notna() & vecinos.fillna('').str.contains(PATRON_ORDEN.pattern)
+    i = _primera(celdas.str.contains('|'.join(PALABRAS_CLAVE['ORDEN'])) & (con_orden | vecino_con_orden))
+    if i is not None:
+        fuente = celdas.iat[i] if con_orden.iat[i] else vecinos.iat[i]
+        encontrados.append((i, 1, 'ORDEN', PATRON_ORDEN.search(fuente).group(0)))
+
+    for prioridad, clave, patron, sin_digitos in ((2, 'ASESOR', PATRON_ETIQUETA_ASESOR, True), (3, 'CLIENTE', PATRON_ETIQUETA_CLIENTE, False)):
+        res = _por_etiqueta(celdas, vecinos, PALABRAS_CLAVE[clave], patron, sin_digitos)
+        if res: encontrados.append((res[0], prioridad, clave, res[1]))
+
+    # Sin palabra clave: el primer número de 8 dígitos de todo el archivo
+    if not any(e[2] == 'ORDEN' for e in encontrados):
+        i = _primera(con_orden)
+        if i is not None: encontrados.append((len(celdas), 4, 'ORDEN', PATRON_ORDEN.search(celdas.iat[i]).group(0)))
+
+    es_sku = celdas.str.match(PATRON_SKU_FMT.pattern) | (celdas.str.match(PATRON_SKU_PLN.pattern) & ~celdas.str.isdigit())
+    hallazgos = [{'sku': celdas.iat[i], 'cant': _cantidad(vecinos.iat[i], False)} for i in np.flatnonzero(es_sku.to_numpy(dtype=bool))]
+    return hallazgos, _metadata(encontrados)
+
+# ==========================================
+# LECTURA EN STREAMING
+# ==========================================
+def elegir_hoja(nombres):
+    return HOJA_PREFERIDA if HOJA_PREFERIDA in nombres else nombres[0]
+
+def leer_filas(archivo, nombre, max_filas=MAX_FILAS_IMPORTACION, tiempos=None):
+    """Genera las filas (tuplas de valores) de la hoja a analizar, sin el encabezado.
+
+    xlsx/xlsm: openpyxl en modo read_only; se leen los nombres de hoja y solo se
+    recorre RESUMEN_DATOS (o la primera), fila por fila, hasta `max_filas`.
+    CSV por bloques con pandas; xls (sin soporte read_only) solo la hoja elegida.
+    PDF con `leer_pdf` (`tiempos` recibe el desglose por página).
+    """
+    nombre = nombre.lower()
+    if nombre.endswith('.pdf'):
+        yield from islice(leer_pdf(archivo, tiempos=tiempos), max_filas)
+        return
+    if nombre.endswith('.csv'):
+        for bloque in pd.read_csv(archivo, encoding='latin-1', on_bad_lines='skip', nrows=max_filas, chunksize=TAMANO_BLOQUE):
+            yield from bloque.itertuples(index=False, name=None)
+        return
+    if nombre.endswith('.xls'):
+        libro = pd.ExcelFile(archivo)
+        yield from libro.parse(elegir_hoja(libro.sheet_names), nrows=max_filas).itertuples(index=False, name=None)
+        return
+
+    from openpyxl import load_workbook
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        hoja = libro[elegir_hoja(libro.sheetnames)]
+        # La primera fila es el encabezado (igual que pd.read_excel)
+        yield from islice(hoja.iter_rows(values_only=True), 1, max_filas + 1)
+    finally:
+        libro.close()
+
+# ==========================================
+# PDF (ÓRDENES DEL DMS Y COTIZACIONES DE PROVEEDOR)
+# ==========================================
+_pdf = None
+
+def _abrir_pdf(datos):
+    """Inicializador de cada proceso: abre el PDF una sola vez."""
+    global _pdf
+    import pdfplumber
+    _pdf = pdfplumber.open(io.BytesIO(datos))
+
+def _extraer_pagina(pagina):
+    """Renglones de las tablas y, fuera de ellas, una fila por línea de texto."""
+    filas = []
+    for tabla in pagina.find_tables():
+        filas.extend(tuple(c if c is not None else '' for c in fila) for fila in tabla.extract())
+        # El texto de la tabla ya salió en sus celdas: no se vuelve a leer como línea
+        pagina = pagina.outside_bbox(tabla.bbox)
+    for linea in (pagina.extract_text() or '').splitlines():
+        if linea.strip(): filas.append(tuple(linea.split()))
+    return filas
+
+def _filas_pagina(num, pdf=None):
+    t0 = time.perf_counter()
+    filas = _extraer_pagina((pdf or _pdf).pages[num])
+    return num, filas, time.perf_counter() - t0
+
+def leer_pdf(archivo, procesos=PROCESOS_PDF, tiempos=None):
+    """Genera las filas del PDF página por página, en orden.
+
+    Las páginas se extraen en paralelo en `procesos` procesos (pdfminer es Python
+    puro, con hilos no avanza); cada proceso abre el PDF una vez. Si se pasa una
+    lista en `tiempos`, se le agrega (página, segundos, filas) por cada página.
+    """
+    import pdfplumber
+    if hasattr(archivo, 'read'): datos = archivo.read()
+    else:
+        with open(archivo, 'rb') as f: datos = f.read()
+    pdf = pdfplumber.open(io.BytesIO(datos))
+    total = len(pdf.pages)
+    ex = None
+    if procesos > 1 and total > 2:
+        pdf.close()
+        ex = ProcessPoolExecutor(max_workers=min(procesos, total), mp_context=CONTEXTO_PDF, initializer=_abrir_pdf, initargs=(datos,))
+        resultados = ex.map(_filas_pagina, range(total))
+    else:
+        resultados = (_filas_pagina(num, pdf) for num in range(total))
+    try:
+        for num, filas, segundos in resultados:
+            if tiempos is not None: tiempos.append((num + 1, segundos, len(filas)))
+            yield from filas
+    finally:
+        if ex: ex.shutdown(cancel_futures=True)
+        else: pdf.close()
+
+def analizar_filas(filas, tamano_bloque=TAMANO_BLOQUE, analizar=analizar_archivo):
+    """`analizar` (`analizar_archivo` o `analizar_archivo_detallado`) sobre un generador de
+    filas, por bloques de `tamano_bloque`.
+
+    La memoria no depende del tamaño del archivo. Cada celda solo mira su vecina de
+    la misma fila, así que partir en bloques da el mismo resultado; de la metadata se
+    conserva el primer valor encontrado.
+    """
+    hallazgos, metadata = [], {}
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, tamano_bloque))
+        if not bloque: break
+        h, m = analizar(pd.DataFrame(bloque, dtype=object))
+        hallazgos.extend(h)
+        for clave, valor in m.items(): metadata.setdefault(clave, valor)
+    return hallazgos, metadata
+
+# ==========================================
+# CRUCE CON EL CATÁLOGO
+# ==========================================
+def cruzar_con_catalogo(hallazgos, df_catalogo):
+    """Cruza todos los SKUs importados contra el catálogo en un solo merge.
+
+    Devuelve (encontrados, no_encontrados, duplicados):
+    - encontrados: filas del catálogo en el orden del archivo, con la columna CANT_IMPORTADA;
+    - no_encontrados: SKUs tal como venían en el archivo que no existen en el catálogo;
+    - duplicados: SKU_CLEAN que aparecen más de una vez en el archivo (se importan todas las veces).
+    """
+    pedidos = pd.DataFrame(hallazgos, columns=['sku', 'cant']).rename(columns={'sku': 'SKU_ARCHIVO', 'cant': 'CANT_IMPORTADA'})
+    pedidos['SKU_CLEAN'] = catalogo.limpiar_sku(pedidos['SKU_ARCHIVO'])
+    duplicados = pedidos.loc[pedidos['SKU_CLEAN'].duplicated(), 'SKU_CLEAN'].unique().tolist()
+    if df_catalogo is None or pedidos.empty:
+        return pd.DataFrame(columns=['CANT_IMPORTADA']), pedidos['SKU_ARCHIVO'].tolist(), duplicados
+
+    pedidos['SKU_CLEAN'] = pedidos['SKU_CLEAN'].astype(df_catalogo['SKU_CLEAN'].dtype)
+    # El catálogo ya viene sin SKU_CLEAN repetidos: el merge no multiplica filas y conserva el orden del archivo
+    cruce = pedidos.merge(df_catalogo, on='SKU_CLEAN', how='left', indicator=True, sort=False, suffixes=('', '_CATALOGO'))
+    hay = (cruce.pop('_merge') == 'both').to_numpy()
+    no_encontrados = cruce.loc[~hay, 'SKU_ARCHIVO'].tolist()
+    return cruce.loc[hay].drop(columns='SKU_ARCHIVO').reset_index(drop=True), no_encontrados, duplicados
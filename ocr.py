@@ -0,0 +1,105 @@
+"""OCR de órdenes de reparación fotografiadas (JPG/PNG) para la Carga Inteligente.
+
+1. `preprocesar`: escala de grises, reducción a LADO_MAX, umbral adaptativo y
+   enderezado (deskew) con OpenCV.
+2. `crear_lector`: easyocr (español/inglés) o, si no está, Tesseract con `spa`.
+   Tarda segundos en cargar: las apps lo guardan con st.cache_resource.
+3. `filas_imagen`: agrupa las palabras detectadas por renglón y las ordena de
+   izquierda a derecha, así cada renglón llega al analizador como una fila con sus
+   celdas vecinas (SKU -> cantidad), igual que en Excel.
+
+    python ocr.py foto.jpg      # filas detectadas y tiempo
+"""
+import hashlib
+import time
+
+import numpy as np
+
+LADO_MAX = 2000
+ANGULO_MAX = 15
+IDIOMAS_EASYOCR = ['es', 'en']
+
+def huella(datos):
+    """Llave de cache de una imagen: sha256 de sus bytes."""
+    return hashlib.sha256(datos).hexdigest()
+
+# ==========================================
+# PREPROCESAMIENTO
+# ==========================================
+def _angulo_inclinacion(binaria):
+    """Inclinación en grados del texto (tinta en blanco sobre negro), 0 si no se puede estimar."""
+    import cv2
+    puntos = cv2.findNonZero(binaria)
+    if puntos is None or len(puntos) < 100: return 0.0
+    # Según la versión, OpenCV da el ángulo en (0, 90] o en [-90, 0): se lleva a (-45, 45]
+    angulo = (cv2.minAreaRect(puntos)[-1] + 45) % 90 - 45
+    return angulo if abs(angulo) <= ANGULO_MAX else 0.0
+
+def preprocesar(datos):
+    """Bytes de JPG/PNG -> imagen binaria (texto negro sobre blanco) lista para OCR."""
+    import cv2
+    gris = cv2.imdecode(np.frombuffer(datos, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gris is None: raise ValueError("No se pudo leer la imagen.")
+    escala = LADO_MAX / max(gris.shape)
+    if escala < 1: gris = cv2.resize(gris, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+
+    # Umbral adaptativo: las fotos del mostrador traen sombras y luz dispareja
+    gris = cv2.GaussianBlur(gris, (3, 3), 0)
+    tinta = cv2.adaptiveThreshold(gris, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 31, 15)
+
+    angulo = _angulo_inclinacion(tinta)
+    if abs(angulo) > 0.5:
+        alto, ancho = tinta.shape
+        giro = cv2.getRotationMatrix2D((ancho / 2, alto / 2), angulo, 1.0)
+        tinta = cv2.warpAffine(tinta, giro, (ancho, alto), flags=cv2.INTER_NEAREST, borderValue=0)
+    return cv2.bitwise_not(tinta)
+
+# ==========================================
+# MOTOR OCR
+# ==========================================
+def crear_lector():
+    """Lector easyocr si está instalado; si no, None (se usa Tesseract)."""
+    try: import easyocr
+    except ImportError: return None
+    return easyocr.Reader(IDIOMAS_EASYOCR, gpu=False, verbose=False)
+
+def _palabras(lector, imagen):
+    """[(x, y_centro, alto, texto)] de cada fragmento detectado."""
+    if lector is not None:
+        return [
+            (min(p[0] for p in caja), sum(p[1] for p in caja) / 4, max(p[1] for p in caja) - min(p[1] for p in caja), texto)
+            for caja, texto, _ in lector.readtext(imagen)
+        ]
+    import pytesseract
+    datos = pytesseract.image_to_data(imagen, lang='spa', output_type=pytesseract.Output.DICT)
+    return [
+        (x, y + h / 2, h, texto)
+        for x, y, h, texto in zip(datos['left'], datos['top'], datos['height'], datos['text'])
+        if texto.strip()
+    ]
+
+def agrupar_renglones(palabras):
+    """Agrupa fragmentos cuyo centro vertical cae dentro de media altura del renglón actual."""
+    filas, renglon, y_renglon, alto_renglon = [], [], None, 0
+    for x, y, alto, texto in sorted(palabras, key=lambda p: p[1]):
+        if renglon and abs(y - y_renglon) > max(alto, alto_renglon) / 2:
+            filas.append(tuple(t for _, t in sorted(renglon)))
+            renglon = []
+        if not renglon: y_renglon, alto_renglon = y, alto
+        renglon.append((x, texto))
+    if renglon: filas.append(tuple(t for _, t in sorted(renglon)))
+    return filas
+
+def filas_imagen(lector, datos):
+    """Bytes de imagen -> filas (tuplas de textos) en orden de lectura."""
+    return agrupar_renglones(_palabras(lector, preprocesar(datos)))
+
+if __name__ == "__main__":
+    import sys
+    t0 = time.perf_counter(); lector = crear_lector()
+    print(f"Lector: {'easyocr' if lector else 'tesseract'} ({time.perf_counter() - t0:.1f}s)")
+    for ruta in sys.argv[1:]:
+        with open(ruta, 'rb') as f: datos = f.read()
+        t0 = time.perf_counter(); filas = filas_imagen(lector, datos)
+        print(f"{ruta}: {len(filas)} renglones en {time.perf_counter() - t0:.2f}s")
+        for fila in filas: print("   ", " | ".join(fila))
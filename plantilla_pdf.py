@@ -0,0 +1,149 @@
+"""Plantilla de los PDF de cotización: membrete y pie legal pre-armados.
+
+- El logo se decodifica una vez por proceso y se reutiliza en todos los documentos.
+  logo.png es en realidad un JPEG; fpdf elige el lector por la extensión, fallaba
+  en silencio (try/except) y el logo nunca salía.
+- El membrete y el pie legal (LFPC / NOM-174) se componen una sola vez por clase
+  en un documento de muestra y se guardan como operadores PDF ya maquetados. En
+  cada página solo se pegan; lo único que se compone es el número de página.
+
+Las apps solo heredan de `PlantillaPDF` y redefinen `componer_pie` /
+`numero_pagina` si su texto legal es otro.
+
+    python plantilla_pdf.py --paginas 20     # costo por página: composición normal vs plantilla
+"""
+import argparse
+import functools
+import re
+import time
+from collections import namedtuple
+
+from fpdf import FPDF
+
+RUTA_LOGO = "logo.png"
+_REFERENCIA = re.compile(r'/(F|I)(\d+) ')      # Fuente / imagen por índice del documento
+_MARCADOR = re.compile(r'/(F|I)<([^>]+)> ')    # La misma referencia, por nombre (en la plantilla)
+
+Plantilla = namedtuple('Plantilla', 'membrete y_membrete pie fuentes imagenes')
+
+@functools.lru_cache(maxsize=None)
+def info_logo(ruta=RUTA_LOGO):
+    """Logo ya decodificado (dict de imagen de fpdf), una vez por proceso; None si no hay o no se puede leer."""
+    try:
+        with open(ruta, 'rb') as f: firma = f.read(8)
+        return FPDF()._parsepng(ruta) if firma.startswith(b'\x89PNG') else FPDF()._parsejpg(ruta)
+    except Exception: return None
+
+def _capturar(pdf, componer):
+    """Operadores que `componer` agrega a la página actual, con fuentes e imágenes por nombre."""
+    inicio = len(pdf.pages[pdf.page]); componer()
+    nombres = {('F', str(f['i'])): clave for clave, f in pdf.fonts.items()}
+    nombres.update({('I', str(im['i'])): nombre for nombre, im in pdf.images.items()})
+    return _REFERENCIA.sub(lambda m: f"/{m[1]}<{nombres[m[1], m[2]]}> ", pdf.pages[pdf.page][inicio:])
+
+_plantillas = {}
+
+class PlantillaPDF(FPDF):
+    """FPDF con membrete y pie pegados desde la plantilla. `directo = True` compone cada página (como antes)."""
+    directo = False
+
+    def componer_membrete(self):
+        logo = info_logo()
+        if logo is not None:
+            if RUTA_LOGO not in self.images: self.images[RUTA_LOGO] = dict(logo, i=len(self.images) + 1)
+            self.image(RUTA_LOGO, 10, 8, 33)
+        self.set_font('Arial', 'B', 16); self.set_text_color(235, 10, 30)
+        self.cell(0, 10, 'TOYOTA LOS FUERTES', 0, 1, 'C')
+        self.set_font('Arial', '', 10); self.set_text_color(0)
+        self.cell(0, 5, 'PRESUPUESTO DE SERVICIOS Y REFACCIONES', 0, 1, 'C'); self.ln(15)
+
+    def componer_pie(self):
+        self.set_y(-75)
+        self.set_font('Arial', 'B', 7); self.set_text_color(0)
+        self.cell(0, 4, 'TÉRMINOS, GARANTÍAS Y MARCO LEGAL (LFPC Y NOM-174-SCFI-2007)', 0, 1, 'L')
+        self.set_font('Arial', '', 6); self.set_text_color(40)
+        legales = (
+            "1. PRECIOS: En Moneda Nacional (MXN) con IVA incluido (Art. 7 LFPC). Válido por 24 horas.\n"
+            "2. GARANTÍA: 12 meses o 20,000 km en refacciones instaladas en taller (Art. 77 LFPC). "
+            "Partes eléctricas sujetas a diagnóstico.\n"
+            "3. PEDIDOS: Requieren 100% anticipo. Cancelaciones imputables al cliente aplican pena del 20%.\n"
+            "4. CLÁUSULAS: Este contrato NO contiene cláusulas abusivas, inequitativas o desproporcionadas (Art. 85 LFPC).\n"
+            "5. ACEPTACIÓN: La firma o confirmación vía electrónica (WhatsApp/Correo) constituye aceptación total."
+        )
+        self.multi_cell(0, 3, legales, 0, 'J')
+        self.ln(5); y_firma = self.get_y()
+        self.line(10, y_firma, 80, y_firma); self.line(110, y_firma, 190, y_firma)
+        self.cell(90, 3, "ASESOR DE SERVICIO", 0, 0, 'C'); self.cell(90, 3, "CLIENTE (NOMBRE Y FIRMA)", 0, 1, 'C')
+
+    def numero_pagina(self):
+        self.set_y(-12); self.set_font('Arial', 'B', 8); self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'R')
+
+    # ==========================================
+    # PLANTILLA (UNA VEZ POR CLASE Y PROCESO)
+    # ==========================================
+    @classmethod
+    def plantilla(cls):
+        if cls not in _plantillas:
+            muestra = cls(); muestra.header = muestra.footer = lambda: None  # Se componen a mano abajo
+            muestra.add_page()
+            membrete = _capturar(muestra, muestra.componer_membrete); y_membrete = muestra.get_y()
+            muestra.in_footer = 1; pie = _capturar(muestra, muestra.componer_pie); muestra.in_footer = 0
+            usados = set(_MARCADOR.findall(membrete + pie))
+            _plantillas[cls] = Plantilla(
+                membrete, y_membrete, pie,
+                {clave: muestra.fonts[clave] for tipo, clave in usados if tipo == 'F'},
+                {nombre: muestra.images[nombre] for tipo, nombre in usados if tipo == 'I'},
+            )
+        return _plantillas[cls]
+
+    def _pegar(self, ops):
+        """Operadores de la plantilla con los índices de este documento (se resuelven una vez por documento)."""
+        resueltos = self.__dict__.setdefault('_resueltos', {})
+        if ops not in resueltos:
+            plantilla = self.plantilla()
+            for clave, fuente in plantilla.fuentes.items():
+                if clave not in self.fonts: self.fonts[clave] = dict(fuente, i=len(self.fonts) + 1)
+            for nombre, imagen in plantilla.imagenes.items():
+                if nombre not in self.images: self.images[nombre] = dict(imagen, i=len(self.images) + 1)
+            recursos = {'F': self.fonts, 'I': self.images}
+            # q/Q: el estado gráfico (fuente, colores) queda como fpdf cree que está
+            resueltos[ops] = 'q\n' + _MARCADOR.sub(lambda m: f"/{m[1]}{recursos[m[1]][m[2]]['i']} ", ops) + 'Q'
+        self._out(resueltos[ops])
+
+    def header(self):
+        if self.directo: self.componer_membrete(); return
+        plantilla = self.plantilla()
+        self._pegar(plantilla.membrete); self.set_y(plantilla.y_membrete)
+
+    def footer(self):
+        if self.directo: self.componer_pie()
+        else: self._pegar(self.plantilla().pie)
+        self.numero_pagina()
+
+# ==========================================
+# MICRO-BENCHMARK
+# ==========================================
+def _documento(clase, paginas, directo):
+    pdf = clase(); pdf.directo = directo
+    pdf.set_auto_page_break(auto=True, margin=80)
+    for _ in range(paginas): pdf.add_page()
+    return pdf.output(dest='S')
+
+def _medir(clase, paginas, directo, repeticiones):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones): _documento(clase, paginas, directo)
+    return (time.perf_counter() - t0) / repeticiones / paginas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Costo por página de membrete + pie: composición normal vs plantilla")
+    parser.add_argument("--paginas", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter(); PlantillaPDF.plantilla()
+    print(f"Plantilla (una vez por proceso): {(time.perf_counter() - t0) * 1000:.1f} ms, logo {'sí' if info_logo() else 'no'}")
+    antes = _medir(PlantillaPDF, args.paginas, True, args.repeticiones)
+    despues = _medir(PlantillaPDF, args.paginas, False, args.repeticiones)
+    print(f"Por página ({args.paginas} páginas x {args.repeticiones} documentos):")
+    print(f"   composición normal: {antes * 1000:6.3f} ms")
+    print(f"   plantilla         : {despues * 1000:6.3f} ms   (x{antes / despues:.1f})")
@@ -0,0 +1,84 @@
+"""Consulta de precios por lote (contratos de flotilla, listas de 500-5,000 SKUs).
+
+Un solo merge de la lista contra el catálogo cacheado por SKU_CLEAN: devuelve SKU,
+descripción en español, precio base y precio con IVA (la misma regla x1.16 del
+verificador de clientes.py), listo para descargar.
+
+    python precios.py lista.xlsx -o precios.xlsx
+"""
+import argparse
+import io
+import sys
+import time
+
+import pandas as pd
+
+import catalogo
+import cotizacion
+
+IVA = cotizacion.IVA
+COLUMNAS_SALIDA = ['SKU', 'SKU_CATALOGO', 'DESCRIPCION', 'PRECIO_BASE', 'PRECIO_CON_IVA', 'ENCONTRADO']
+
+def leer_lista(archivo, nombre):
+    """Columna de SKUs de un CSV/xlsx, con o sin encabezado (se reconoce como en el catálogo)."""
+    if nombre.lower().endswith('.csv'):
+        df = pd.read_csv(archivo, header=None, dtype=str, encoding='latin-1', on_bad_lines='skip')
+    else:
+        df = pd.read_excel(archivo, header=None, dtype=str)
+    if df.empty: return pd.Series([], dtype=object)
+    encabezado = df.iloc[0].fillna('').astype(str).str.strip().str.upper().tolist()
+    c_sku, _, _ = catalogo.detectar_columnas(encabezado)
+    if c_sku: return df.iloc[1:, encabezado.index(c_sku)].dropna().reset_index(drop=True)
+    return df.iloc[:, 0].dropna().reset_index(drop=True)
+
+def cotizar_lote(skus, df, c_sku, c_desc):
+    """DataFrame con COLUMNAS_SALIDA, una fila por SKU de la lista y en el mismo orden.
+
+    La descripción es la DESC_ES pretraducida (python traduccion.py); si no la hay,
+    la original. No se llama al traductor para no depender de la red en lotes grandes.
+    """
+    # SKU_PEDIDO: no choca con la columna de SKU del catálogo aunque esta se llame 'SKU'
+    pedidos = pd.DataFrame({'SKU_PEDIDO': pd.Series(skus, dtype=object).astype(str).str.strip()})
+    pedidos['SKU_CLEAN'] = catalogo.limpiar_sku(pedidos['SKU_PEDIDO']).astype(df['SKU_CLEAN'].dtype)
+    columnas = list(dict.fromkeys(['SKU_CLEAN', c_sku, c_desc, 'PRECIO_NUM'] + (['DESC_ES'] if 'DESC_ES' in df.columns else [])))
+    cruce = pedidos.merge(df[columnas], on='SKU_CLEAN', how='left', sort=False)
+
+    descripcion = cruce[c_desc].astype(object)
+    if 'DESC_ES' in cruce.columns:
+        desc_es = cruce['DESC_ES'].astype(object)
+        descripcion = desc_es.where(desc_es.notna() & (desc_es != ''), descripcion)
+    base = cruce['PRECIO_NUM'].astype('float64')
+    return pd.DataFrame({
+        'SKU': cruce['SKU_PEDIDO'],
+        'SKU_CATALOGO': cruce[c_sku].astype(object),
+        'DESCRIPCION': descripcion,
+        'PRECIO_BASE': base.round(2),
+        'PRECIO_CON_IVA': (base * (1 + IVA)).round(2),
+        'ENCONTRADO': base.notna(),
+    }, columns=COLUMNAS_SALIDA)
+
+def a_csv(resultado):
+    """Bytes de un CSV (UTF-8 con BOM para que Excel respete los acentos). Mucho más rápido que .xlsx."""
+    return resultado.to_csv(index=False).encode('utf-8-sig')
+
+def a_excel(resultado):
+    """Bytes de un .xlsx con el resultado (para st.download_button)."""
+    buffer = io.BytesIO()
+    resultado.to_excel(buffer, index=False, sheet_name='PRECIOS')
+    return buffer.getvalue()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precios por lote a partir de una lista de SKUs (CSV/xlsx)")
+    parser.add_argument("lista")
+    parser.add_argument("-o", "--salida", default="precios.xlsx", help=".xlsx o .csv")
+    args = parser.parse_args()
+
+    df, c_sku, c_desc, _ = catalogo.cargar_catalogo()
+    if df is None: sys.exit("Sin catálogo.")
+    skus = leer_lista(args.lista, args.lista)
+    t0 = time.perf_counter()
+    resultado = cotizar_lote(skus, df, c_sku, c_desc)
+    dt = time.perf_counter() - t0
+    with open(args.salida, 'wb') as f:
+        f.write(a_csv(resultado) if args.salida.lower().endswith('.csv') else a_excel(resultado))
+    print(f"{len(resultado):,} SKUs ({int(resultado['ENCONTRADO'].sum()):,} encontrados) en {dt * 1000:.0f} ms -> {args.salida}")
@@ -1,15 +1,19 @@
 import streamlit as st
 import pandas as pd
-from deep_translator import GoogleTranslator
 from datetime import datetime
-from fpdf import FPDF
 import pytz
-import re
 import os
+import hashlib
 import base64
 import urllib.parse
 import math
-import zipfile  # Necesario para la nueva carga de datos
+import catalogo
+import importador
+import ocr
+import precios
+import busqueda
+import plantilla_pdf
+import traduccion
 
 # ==========================================
 # 1. CONFIGURACIÓN E INICIALIZACIÓN
@@ -25,6 +29,7 @@ def init_session():
     defaults = {
         'carrito': [],
         'errores_carga': [],
+        'tiempos_pdf': [],
         'cliente': "",
         'vin': "",
         'orden': "",
@@ -42,6 +47,7 @@ def init_session():
 def limpiar_todo():
     st.session_state.carrito = []
     st.session_state.errores_carga = []
+    st.session_state.tiempos_pdf = []
     st.session_state.cliente = ""
     st.session_state.vin = ""
     st.session_state.orden = ""
@@ -185,152 +191,48 @@ if st.session_state.nieve_activa:
 # ==========================================
 # 3. LÓGICA DE DATOS (ACTUALIZADA CON ZIP Y DETECCIÓN INTELIGENTE)
 # ==========================================
-@st.cache_data
-def cargar_catalogo():
-    archivo_zip = "base_datos_2026.zip"
-   
-    if not os.path.exists(archivo_zip):
-        return None, None, None
- 
-    try:
-        with zipfile.ZipFile(archivo_zip, "r") as z:
-            # Buscar archivos válidos (ignorando temporales y macosx)
-            archivos_validos = [
-                f for f in z.namelist()
-                if (f.endswith('.xlsx') or f.endswith('.xls') or f.endswith('.csv'))
-                and not f.startswith('~')
-                and '__MACOSX' not in f
-            ]
-           
-            if not archivos_validos:
-                return None, None, None
-           
-            # Usar el primer archivo válido encontrado
-            archivo_elegido = archivos_validos[0]
-           
-            with z.open(archivo_elegido) as f:
-                if archivo_elegido.endswith('.csv'):
-                    # Intentar leer CSV con diferentes encodings
-                    try:
-                        df = pd.read_csv(f, dtype=str)
-                    except:
-                        f.seek(0)
-                        df = pd.read_csv(f, dtype=str, encoding='latin-1')
-                else:
-                    df = pd.read_excel(f, dtype=str)
- 
-        # Limpieza de columnas
-        df.dropna(how='all', inplace=True)
-        df.columns = [str(c).strip().upper() for c in df.columns]
- 
-        # --- Detección de columnas ---
-        # 1. SKU (Buscamos 'ITEM' primero, luego variantes)
-        c_sku = next((c for c in df.columns if c == 'ITEM'), None)
-        if not c_sku:
-            c_sku = next((c for c in df.columns if 'PART' in c or 'NUM' in c or 'SKU' in c), None)
- 
-        # 2. Descripción
-        c_desc = next((c for c in df.columns if 'DESC' in c), None)
- 
-        # 3. Precio (Buscamos 'TOTAL_UNITARIO' primero, luego variantes)
-        c_precio = next((c for c in df.columns if c == 'TOTAL_UNITARIO'), None)
-        if not c_precio:
-            c_precio = next((c for c in df.columns if 'TOTAL' in c or 'PRECIO' in c or 'PRICE' in c), None)
- 
-        if not c_sku or not c_precio:
-            return None, None, None
- 
-        # Procesar datos
-        df.drop_duplicates(subset=[c_sku], keep='first', inplace=True)
-        df['SKU_CLEAN'] = df[c_sku].astype(str).str.replace('-', '').str.strip().str.upper()
- 
-        def limpiar_precio(x):
-            try:
-                txt = str(x).replace('$', '').replace(',', '').strip()
-                return float(txt)
-            except:
-                return 0.0
- 
-        df['PRECIO_NUM'] = df[c_precio].apply(limpiar_precio)
- 
-        return df, c_sku, c_desc
- 
-    except Exception as e:
-        return None, None, None
+# Catálogo + índice de búsqueda (prefijo de SKU + trigramas) por proceso. El hilo de fondo se
+# arranca con la primera sesión, arma la versión sin bloquearla y calienta las traducciones; luego
+# revisa el zip y los deltas y publica la versión nueva completa fuera del request. Cada rerun
+# toma la versión vigente; un delta que solo cambia precios reutiliza el índice.
+# memory-map: todas las sesiones comparten el mismo catálogo de solo lectura.
+@st.cache_resource
+def catalogo_vivo():
+    return catalogo.CatalogoVivo(
+        indexar=lambda df, c_sku, c_desc: busqueda.IndiceBusqueda(df['SKU_CLEAN'], df[c_desc]),
+        calentar=[traduccion.calentar],
+    ).iniciar()
 
-df_db, col_sku_db, col_desc_db = cargar_catalogo()
+# Aviso mientras el hilo de fondo arma el catálogo: se revisa solo cada 2 s y recarga la app al estar listo
+@st.fragment(run_every=2)
+def aviso_catalogo_cargando():
+    if catalogo_vivo().listo.is_set(): st.rerun()
+    st.info("⏳ Cargando catálogo... La búsqueda se activa en unos segundos; mientras tanto puedes capturar partidas manuales.")
 
-def analizador_inteligente_archivos(df_raw):
-    hallazgos = []; metadata = {}
-    df = df_raw.astype(str).apply(lambda x: x.str.upper().str.strip())
-    patron_vin = r'\b[A-HJ-NPR-Z0-9]{17}\b'
-    patron_orden_8 = r'\b\d{8}\b'
-    patron_sku_fmt = r'\b[A-Z0-9]{5}-[A-Z0-9]{5}\b'
-    patron_sku_pln = r'\b[A-Z0-9]{10,12}\b'
-    keywords = {'ORDEN': ['ORDEN', 'FOLIO', 'OT', 'OS'], 'ASESOR': ['ASESOR', 'SA', 'ATENDIO', 'ADVISOR'], 'CLIENTE': ['CLIENTE', 'ATTN', 'NOMBRE']}
- 
-    for r_idx, row in df.iterrows():
-        for c_idx, val in row.items():
-            if 'VIN' not in metadata:
-                m = re.search(patron_vin, val)
-                if m: metadata['VIN'] = m.group(0)
-           
-            if 'ORDEN' not in metadata:
-                if any(k in val for k in keywords['ORDEN']):
-                    m = re.search(patron_orden_8, val)
-                    if m: metadata['ORDEN'] = m.group(0)
-                    else:
-                        try:
-                            vecino = str(df.iloc[r_idx, df.columns.get_loc(c_idx)+1])
-                            m2 = re.search(patron_orden_8, vecino)
-                            if m2: metadata['ORDEN'] = m2.group(0)
-                        except: pass
-           
-            if 'ASESOR' not in metadata and any(k in val for k in keywords['ASESOR']):
-                cont = re.sub(r'(?:ASESOR|SA|ATENDIO|ADVISOR)[\:\.\-\s]*', '', val).strip()
-                if len(cont)>4 and not re.search(r'\d', cont): metadata['ASESOR'] = cont
-                else:
-                    try:
-                        vec = str(df.iloc[r_idx, df.columns.get_loc(c_idx)+1]).strip()
-                        if len(vec)>4 and not re.search(r'\d', vec): metadata['ASESOR'] = vec
-                    except: pass
-           
-            if 'CLIENTE' not in metadata and any(k in val for k in keywords['CLIENTE']):
-                cont = re.sub(r'(?:CLIENTE|ATTN|NOMBRE)[\:\.\-\s]*', '', val).strip()
-                if len(cont)>4: metadata['CLIENTE'] = cont
-                else:
-                    try:
-                        vec = str(df.iloc[r_idx, df.columns.get_loc(c_idx)+1]).strip()
-                        if len(vec)>4: metadata['CLIENTE'] = vec
-                    except: pass
-           
-            es_sku = False; sku_det = None
-            if re.match(patron_sku_fmt, val): sku_det = val; es_sku = True
-            elif re.match(patron_sku_pln, val) and not val.isdigit(): sku_det = val; es_sku = True
-           
-            if es_sku:
-                cant = 1
-                try:
-                    vecino = df.iloc[r_idx, df.columns.get_loc(c_idx)+1].replace('.0', '')
-                    if vecino.isdigit(): cant = int(vecino)
-                except: pass
-                hallazgos.append({'sku': sku_det, 'cant': cant})
-   
-    if 'ORDEN' not in metadata:
-        for _, row in df.iterrows():
-            for val in row:
-                m = re.search(patron_orden_8, str(val))
-                if m: metadata['ORDEN'] = m.group(0); break
-            if 'ORDEN' in metadata: break
-           
-    return hallazgos, metadata
+# Motor OCR: se carga una vez por proceso (easyocr tarda segundos en iniciar)
+@st.cache_resource(show_spinner="Cargando motor OCR...")
+def cargar_ocr():
+    return ocr.crear_lector()
 
-def agregar_item_callback(sku, desc_raw, precio_base, cant, tipo, prioridad="Medio", abasto="⚠️ REVISAR", traducir=True):
-    if traducir:
-        try: desc = GoogleTranslator(source='en', target='es').translate(str(desc_raw))
-        except: desc = str(desc_raw)
-    else:
-        desc = str(desc_raw)
+# Filas leídas de una foto, por huella (sha256) de la imagen: volver a subirla no repite el OCR
+@st.cache_data(max_entries=32, show_spinner=False)
+def leer_imagen(huella, _datos):
+    return ocr.filas_imagen(cargar_ocr(), _datos)
+
+# Precios por lote por huella (sha256) de la lista y firma del catálogo: los reruns (clics en el
+# carrito, búsqueda, fragmentos) no vuelven a leer el archivo ni a cruzarlo contra el catálogo
+@st.cache_data(max_entries=16, show_spinner=False)
+def precios_lote(huella, firma, nombre, _archivo, _version):
+    resultado = precios.cotizar_lote(precios.leer_lista(_archivo, nombre), _version.df, _version.c_sku, _version.c_desc)
+    return int(resultado['ENCONTRADO'].sum()), len(resultado), precios.a_csv(resultado)
+
+listo_db = catalogo_vivo().listo.is_set()  # Antes de leer la versión: si ya estaba listo, la versión es la buena
+version_db = catalogo_vivo().vigente()
+df_db, col_sku_db, col_desc_db, indice_db = version_db.df, version_db.c_sku, version_db.c_desc, version_db.indice
+
+def agregar_item_callback(sku, desc_raw, precio_base, cant, tipo, prioridad="Medio", abasto="⚠️ REVISAR", traducir=True, desc_es=None):
+    # desc_es: DESC_ES pretraducida del catálogo (python traduccion.py); si no hay, se traduce aquí
+    desc = desc_es or (traduccion.traducir(desc_raw) if traducir else str(desc_raw))
    
     iva_monto = (precio_base * cant) * 0.16
     total_linea = (precio_base * cant) + iva_monto
@@ -353,8 +255,7 @@ def agregar_item_callback(sku, desc_raw, precio_base, cant, tipo, prioridad="Med
 
 def cargar_en_manual(sku, desc, precio):
     st.session_state.temp_sku = sku
-    try: st.session_state.temp_desc = GoogleTranslator(source='en', target='es').translate(str(desc))
-    except: st.session_state.temp_desc = str(desc)
+    st.session_state.temp_desc = traduccion.traducir(desc)
     st.session_state.temp_precio = precio
 
 def toggle_preview(): st.session_state.ver_preview = not st.session_state.ver_preview
@@ -364,17 +265,9 @@ def toggle_nieve(): st.session_state.nieve_activa = not st.session_state.nieve_a
 # ==========================================
 # 4. GENERADOR PDF (LÓGICA COLOR ACTUALIZADA)
 # ==========================================
-class PDF(FPDF):
-    def header(self):
-        if os.path.exists("logo.png"):
-            try: self.image("logo.png", 10, 8, 33)
-            except: pass
-        self.set_font('Arial', 'B', 16); self.set_text_color(235, 10, 30)
-        self.cell(0, 10, 'TOYOTA LOS FUERTES', 0, 1, 'C')
-        self.set_font('Arial', '', 10); self.set_text_color(0)
-        self.cell(0, 5, 'PRESUPUESTO DE SERVICIOS Y REFACCIONES', 0, 1, 'C'); self.ln(15)
- 
-    def footer(self):
+class PDF(plantilla_pdf.PlantillaPDF):
+    # Membrete y logo de la plantilla; el pie legal de esta versión se maqueta una sola vez por proceso
+    def componer_pie(self):
         # Posición a 7.5 cm del final para dar espacio al texto legal completo
         self.set_y(-75)
        
@@ -412,12 +305,12 @@ class PDF(FPDF):
         self.set_font('Arial', 'B', 6)
         self.cell(90, 3, "TOYOTA LOS FUERTES (ASESOR)", 0, 0, 'C')
         self.cell(90, 3, "NOMBRE Y FIRMA DE CONFORMIDAD DEL CLIENTE", 0, 1, 'C')
-       
-        # Paginación
+
+    def numero_pagina(self):
         self.set_y(-12)
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'R')
-       
+
 def generar_pdf():
     pdf = PDF()
     pdf.add_page()
@@ -563,7 +456,9 @@ def generar_pdf():
 # ==========================================
 # 5. UI PRINCIPAL
 # ==========================================
-if df_db is None:
+if not listo_db:
+    aviso_catalogo_cargando()
+elif df_db is None:
     # Solo advertencia si no hay base de datos, para permitir uso manual
     st.warning(f"⚠️ Atención: No se encontró 'base_datos_2026.zip'. La búsqueda automática no funcionará, pero puedes agregar ítems manualmente.")
 
@@ -593,39 +488,61 @@ with st.sidebar:
     # MODIFICACIÓN PARA EXCEL CON MACROS (XLSM)
     # -------------------------------------------------------------
     st.markdown("### 🤖 Carga Inteligente")
-    uploaded_file = st.file_uploader("Excel / Macros / CSV", type=['xlsx', 'xlsm', 'csv'], label_visibility="collapsed")
+    uploaded_file = st.file_uploader("Excel / Macros / CSV / PDF / Foto", type=['xlsx', 'xlsm', 'csv', 'pdf', 'jpg', 'jpeg', 'png'], label_visibility="collapsed")
     
     if uploaded_file and st.button("Analizar Archivo", type="primary"):
         with st.status("Procesando...", expanded=False) as status:
             try:
-                # Lectura inteligente: Si es CSV lee como csv, si no (xlsx/xlsm) lee como excel
-                if uploaded_file.name.endswith('.csv'):
-                    df_up = pd.read_csv(uploaded_file, encoding='latin-1', on_bad_lines='skip')
+                # Lectura inteligente: PDF por páginas en paralelo, CSV como csv, si no (xlsx/xlsm) como excel
+                st.session_state.tiempos_pdf = []
+                if uploaded_file.name.lower().endswith('.pdf'):
+                    # Por bloques de filas conforme salen las páginas: la memoria no depende del tamaño del PDF
+                    filas = importador.leer_pdf(uploaded_file, tiempos=st.session_state.tiempos_pdf)
+                    items, meta = importador.analizar_filas(filas, analizar=importador.analizar_archivo_detallado)
                 else:
-                    df_up = pd.read_excel(uploaded_file)
-                
-                items, meta = analizador_inteligente_archivos(df_up)
+                    if uploaded_file.name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                        datos = uploaded_file.getvalue()
+                        df_up = pd.DataFrame(leer_imagen(ocr.huella(datos), datos), dtype=object)
+                    elif uploaded_file.name.endswith('.csv'):
+                        df_up = pd.read_csv(uploaded_file, encoding='latin-1', on_bad_lines='skip')
+                    else:
+                        df_up = pd.read_excel(uploaded_file)
+                    items, meta = importador.analizar_archivo_detallado(df_up)
+
                 if 'CLIENTE' in meta: st.session_state.cliente = meta['CLIENTE']
                 if 'VIN' in meta: st.session_state.vin = meta['VIN']
                 if 'ORDEN' in meta: st.session_state.orden = meta['ORDEN']
                 if 'ASESOR' in meta: st.session_state.asesor = meta['ASESOR']
                
-                exitos, fallos = 0, []
-                for it in items:
-                    clean = str(it['sku']).upper().replace('-', '').strip()
-                    # Solo buscar si tenemos base de datos cargada
-                    if df_db is not None:
-                        match = df_db[df_db['SKU_CLEAN'] == clean]
-                        if not match.empty:
-                            row = match.iloc[0]
-                            agregar_item_callback(row[col_sku_db], row[col_desc_db], row['PRECIO_NUM'], it['cant'], "Refacción", "Medio", "⚠️ REVISAR", traducir=True)
-                            exitos += 1
-                        else: fallos.append(it['sku'])
-                    else:
-                        fallos.append(it['sku'])
+                encontrados, fallos, duplicados = importador.cruzar_con_catalogo(items, df_db)
+                st.session_state.errores_carga = fallos + [f"{sku} (repetido en el archivo, se importó cada vez)" for sku in duplicados]
+
+                # Traducción concurrente de las descripciones que no vienen pretraducidas
+                barra = st.progress(0.0, text="Traduciendo descripciones...")
+                por_traducir = [row[col_desc_db] for _, row in encontrados.iterrows() if not catalogo.descripcion_es(row)]
+                traducidas = traduccion.traducir_varios(por_traducir, progreso=lambda h, n: barra.progress(h / n if n else 1.0, text=f"Traduciendo {h}/{n}..."))
+                exitos = 0
+                for _, row in encontrados.iterrows():
+                    desc_es = catalogo.descripcion_es(row) or traducidas.get(str(row[col_desc_db]))
+                    agregar_item_callback(row[col_sku_db], row[col_desc_db], row['PRECIO_NUM'], int(row['CANT_IMPORTADA']), "Refacción", "Medio", "⚠️ REVISAR", traducir=False, desc_es=desc_es)
+                    exitos += 1
                 status.update(label=f"✅ {exitos} items importados", state="complete")
                 st.rerun()
             except Exception as e: st.error(f"Error: {e}")
+    if st.session_state.errores_carga:
+        with st.expander(f"⚠️ {len(st.session_state.errores_carga)} partidas sin importar / revisar"):
+            st.write("\n".join(f"- {e}" for e in st.session_state.errores_carga))
+    if st.session_state.tiempos_pdf:
+        with st.expander(f"⏱️ PDF: {len(st.session_state.tiempos_pdf)} páginas en {sum(t[1] for t in st.session_state.tiempos_pdf):.1f} s"):
+            st.dataframe(pd.DataFrame(st.session_state.tiempos_pdf, columns=["Página", "Segundos", "Filas"]), hide_index=True, use_container_width=True)
+
+    st.divider(); st.markdown("### 💲 Precios por Lote")
+    lista_file = st.file_uploader("Lista de SKUs (CSV / Excel)", type=['csv', 'xlsx', 'xls'], key="lista_precios", label_visibility="collapsed")
+    if lista_file is not None and df_db is not None:
+        # Un solo merge contra el catálogo: 10k SKUs en milisegundos (y una vez por archivo y versión)
+        encontrados, total, csv = precios_lote(hashlib.sha256(lista_file.getvalue()).hexdigest(), version_db.firma, lista_file.name, lista_file, version_db)
+        st.caption(f"{encontrados:,} de {total:,} SKUs encontrados")
+        st.download_button("DESCARGAR PRECIOS (CSV)", csv, file_name="precios_lote.csv", mime="text/csv", use_container_width=True)
     # -------------------------------------------------------------
 
     st.divider()
@@ -647,14 +564,12 @@ with st.expander("🔎 Agregar Ítems (Refacciones o Mano de Obra)", expanded=Tr
            
             # Solo buscar si hay DB cargada
             if q and df_db is not None:
-                b_raw = q.upper().strip().replace('-', '')
-                mask = df_db.apply(lambda x: x.astype(str).str.contains(q, case=False)).any(axis=1) | df_db['SKU_CLEAN'].str.contains(b_raw, na=False)
-                for _, row in df_db[mask].head(3).iterrows():
+                for _, row in df_db.iloc[busqueda.top_k(df_db, indice_db, q, [col_sku_db, col_desc_db, 'PRECIO_NUM'])].iterrows():
                     c1, c2 = st.columns([3, 1])
                     sku_db = row[col_sku_db]; pr_db = row['PRECIO_NUM']
                     c1.markdown(f"**{sku_db}**\n${pr_db:,.2f}")
                     # Sin lápiz, solo agregar
-                    c2.button("➕ Agregar", key=f"ad_{sku_db}", type="primary", on_click=agregar_item_callback, args=(sku_db, row[col_desc_db], pr_db, 1, "Refacción"))
+                    c2.button("➕ Agregar", key=f"ad_{sku_db}", type="primary", on_click=agregar_item_callback, args=(sku_db, row[col_desc_db], pr_db, 1, "Refacción"), kwargs={'desc_es': catalogo.descripcion_es(row)})
             elif q and df_db is None:
                 st.info("Base de datos no cargada. Usa la carga manual.")
  
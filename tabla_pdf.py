@@ -0,0 +1,128 @@
+"""Motor de tablas para los PDF de cotización (fpdf 1.7).
+
+Cada fila se mide y se parte en líneas una sola vez, con el ancho de cada palabra
+memorizado por fuente. Así se conocen la altura exacta de cada fila y los saltos de
+página antes de dibujar: sin multi_cell + set_xy para regresar y sin filas que se
+metan en el pie legal. Refacciones y mano de obra salen por el mismo `dibujar_seccion`.
+"""
+from collections import namedtuple
+
+ALTO_LINEA = 4
+ALTO_MIN_FILA = 6
+ALTO_ENCABEZADO = 8
+ALTO_TITULO = 6
+FUENTE_ENCABEZADO = ('Arial', 'B', 7)
+FUENTE_CUERPO = ('Arial', '', 8)
+FONDO_ENCABEZADO = (240, 240, 240)
+
+# anchos: mm por columna; alineacion: 'C'/'L'/'R' por columna; ajustar: columna que se parte en líneas
+Columnas = namedtuple('Columnas', 'anchos encabezados alineacion ajustar')
+# celdas: textos ya en latin-1; colores: {columna: (fondo, texto)} con RGB o None
+Fila = namedtuple('Fila', 'celdas colores')
+Renglon = namedtuple('Renglon', 'fila lineas alto nueva_pagina')
+
+# ==========================================
+# MEDICIÓN (MEMORIZADA POR FUENTE)
+# ==========================================
+_anchos = {}  # 'helveticaB' -> {palabra: ancho en milésimas del tamaño de fuente}
+
+def _medidas(pdf):
+    """Dict palabra -> ancho (milésimas) de la fuente actual; se llena conforme se usa."""
+    clave = pdf.font_family + pdf.font_style
+    if clave not in _anchos: _anchos[clave] = {}
+    return _anchos[clave], pdf.current_font['cw']
+
+def _ancho_palabra(medidas, cw, palabra):
+    ancho = medidas.get(palabra)
+    if ancho is None: ancho = medidas[palabra] = sum(cw.get(c, 0) for c in palabra)
+    return ancho
+
+def ancho_texto(pdf, texto):
+    """Ancho en mm de `texto` con la fuente actual (igual que get_string_width, con cache)."""
+    medidas, cw = _medidas(pdf)
+    palabras = texto.split(' ')
+    total = sum(_ancho_palabra(medidas, cw, p) for p in palabras) + (len(palabras) - 1) * cw.get(' ', 0)
+    return total * pdf.font_size / 1000.0
+
+def partir(pdf, texto, ancho):
+    """Líneas de `texto` que caben en una celda de `ancho` mm (mismos cortes que multi_cell)."""
+    medidas, cw = _medidas(pdf)
+    disponible = (ancho - 2 * pdf.c_margin) * 1000.0 / pdf.font_size
+    espacio = cw.get(' ', 0)
+    lineas = []
+    for parrafo in texto.replace('\r', '').split('\n'):
+        linea, ocupado = [], 0
+        for palabra in parrafo.split(' '):
+            largo = _ancho_palabra(medidas, cw, palabra)
+            if linea and ocupado + espacio + largo > disponible:
+                lineas.append(' '.join(linea)); linea, ocupado = [], 0
+            if largo > disponible:  # Palabra más ancha que la celda: se corta por caracteres
+                trozo, ocupado = '', 0
+                for c in palabra:
+                    if trozo and ocupado + cw.get(c, 0) > disponible: lineas.append(trozo); trozo, ocupado = '', 0
+                    trozo += c; ocupado += cw.get(c, 0)
+                linea = [trozo]; continue
+            ocupado = ocupado + espacio + largo if linea else largo
+            linea.append(palabra)
+        lineas.append(' '.join(linea))
+    return lineas
+
+# ==========================================
+# MAQUETADO Y DIBUJO
+# ==========================================
+def maquetar(pdf, columnas, filas, y, y_pagina):
+    """Una pasada: líneas, alto y salto de página de cada fila, partiendo de la altura `y`.
+
+    `y_pagina` es donde empieza el contenido en una página nueva (debajo del membrete);
+    el límite es el disparador de salto de fpdf, o sea arriba del pie legal.
+    """
+    pdf.set_font(*FUENTE_CUERPO)
+    ancho = columnas.anchos[columnas.ajustar]
+    limite = pdf.page_break_trigger
+    renglones = []
+    for fila in filas:
+        lineas = partir(pdf, fila.celdas[columnas.ajustar], ancho)
+        alto = max(ALTO_MIN_FILA, len(lineas) * ALTO_LINEA)
+        nueva_pagina = y + alto > limite
+        if nueva_pagina: y = y_pagina + ALTO_ENCABEZADO
+        renglones.append(Renglon(fila, lineas, alto, nueva_pagina))
+        y += alto
+    return renglones
+
+def _encabezado(pdf, columnas):
+    pdf.set_fill_color(*FONDO_ENCABEZADO); pdf.set_text_color(0, 0, 0); pdf.set_font(*FUENTE_ENCABEZADO)
+    for ancho, titulo in zip(columnas.anchos, columnas.encabezados): pdf.cell(ancho, ALTO_ENCABEZADO, titulo, 1, 0, 'C', True)
+    pdf.ln(); pdf.set_font(*FUENTE_CUERPO)
+
+def _fila(pdf, columnas, renglon):
+    x, y = pdf.l_margin, pdf.get_y()
+    for i, (ancho, texto, alinear) in enumerate(zip(columnas.anchos, renglon.fila.celdas, columnas.alineacion)):
+        fondo, tinta = renglon.fila.colores.get(i, (None, None))
+        if fondo: pdf.set_fill_color(*fondo)
+        if tinta: pdf.set_text_color(*tinta)
+        pdf.set_xy(x, y)
+        if i == columnas.ajustar:
+            if fondo: pdf.rect(x, y, ancho, renglon.alto, 'DF')
+            else: pdf.rect(x, y, ancho, renglon.alto)
+            for n, linea in enumerate(renglon.lineas):
+                pdf.set_xy(x, y + n * ALTO_LINEA); pdf.cell(ancho, ALTO_LINEA, linea, 0, 0, alinear)
+        else:
+            pdf.cell(ancho, renglon.alto, texto, 1, 0, alinear, bool(fondo))
+        if tinta: pdf.set_text_color(0, 0, 0)
+        x += ancho
+    pdf.set_xy(pdf.l_margin, y + renglon.alto)
+
+def dibujar_seccion(pdf, titulo, color, columnas, filas, y_pagina):
+    """Banda de título, encabezado de columnas y filas; repite el encabezado en cada página nueva.
+
+    Si el título, el encabezado y la primera fila no caben juntos, la sección abre página.
+    """
+    renglones = maquetar(pdf, columnas, filas, pdf.get_y() + ALTO_TITULO + ALTO_ENCABEZADO, y_pagina)
+    if renglones and renglones[0].nueva_pagina:
+        pdf.add_page(); renglones = maquetar(pdf, columnas, filas, pdf.get_y() + ALTO_TITULO + ALTO_ENCABEZADO, y_pagina)
+    pdf.set_fill_color(*color); pdf.set_font('Arial', 'B', 9); pdf.set_text_color(255, 255, 255)
+    pdf.cell(0, ALTO_TITULO, titulo, 0, 1, 'L', True)
+    _encabezado(pdf, columnas)
+    for renglon in renglones:
+        if renglon.nueva_pagina: pdf.add_page(); _encabezado(pdf, columnas)
+        _fila(pdf, columnas, renglon)
@@ -0,0 +1,61 @@
+"""Firma del catálogo y recarga en caliente cuando el zip solo cambia de mtime.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import zipfile
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import catalogo
+
+@pytest.fixture
+def rutas(tmp_path):
+    csv = tmp_path / "lista.csv"
+    pd.DataFrame({
+        'ITEM': ['04465-AB010', '90915-YZZD1', '17801-0T020'],
+        'DESCRIPCION': ['BRAKE PAD FRONT', 'OIL FILTER', 'AIR FILTER'],
+        'TOTAL_UNITARIO': ['$1,200.00', '150.50', '480'],
+    }).to_csv(csv, index=False)
+    ruta_zip = tmp_path / "base.zip"
+    with zipfile.ZipFile(ruta_zip, 'w') as z: z.write(csv, "lista.csv")
+    return str(ruta_zip), str(tmp_path / "base.arrow"), tmp_path
+
+def _delta(carpeta, nombre, sku, precio):
+    ruta = carpeta / nombre
+    pd.DataFrame({'ITEM': [sku], 'TOTAL_UNITARIO': [precio]}).to_csv(ruta, index=False)
+    return str(ruta)
+
+def _tocar(ruta_zip):
+    """Mismo contenido, otro mtime (como una copia o un checkout)."""
+    st = os.stat(ruta_zip)
+    os.utime(ruta_zip, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+def _precio(df, sku_clean):
+    return float(df.loc[df['SKU_CLEAN'] == sku_clean, 'PRECIO_NUM'].iloc[0])
+
+def test_firma_cambia_con_deltas_despues_de_tocar_el_zip(rutas):
+    ruta_zip, ruta_cache, carpeta = rutas
+    catalogo.cargar_catalogo(ruta_zip, ruta_cache)
+    _tocar(ruta_zip)
+    catalogo.aplicar_delta(_delta(carpeta, "d1.csv", '90915-YZZD1', '170'), ruta_zip, ruta_cache)
+    primera = catalogo.firma_catalogo(ruta_zip, ruta_cache)
+    catalogo.aplicar_delta(_delta(carpeta, "d2.csv", '90915-YZZD1', '175'), ruta_zip, ruta_cache)
+    segunda = catalogo.firma_catalogo(ruta_zip, ruta_cache)
+    assert primera[2] == 1 and segunda[2] == 2
+    assert segunda != primera
+
+def test_catalogo_vivo_recarga_deltas_despues_de_tocar_el_zip(rutas):
+    ruta_zip, ruta_cache, carpeta = rutas
+    vivo = catalogo.CatalogoVivo(ruta_zip=ruta_zip, ruta_cache=ruta_cache)
+    assert vivo.revisar()
+    _tocar(ruta_zip)
+    catalogo.aplicar_delta(_delta(carpeta, "d1.csv", '90915-YZZD1', '170'), ruta_zip, ruta_cache)
+    assert vivo.revisar()
+    assert _precio(vivo.actual.df, '90915YZZD1') == 170.0
+    catalogo.aplicar_delta(_delta(carpeta, "d2.csv", '90915-YZZD1', '175'), ruta_zip, ruta_cache)
+    assert vivo.revisar()
+    assert _precio(vivo.actual.df, '90915YZZD1') == 175.0
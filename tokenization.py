@@ -1,15 +1,19 @@
 import streamlit as st
 import pandas as pd
-from deep_translator import GoogleTranslator
 from datetime import datetime
-from fpdf import FPDF
 import pytz
-import re
 import os
-import zipfile
+import hashlib
 import urllib.parse
-import math
 import json
+import catalogo
+import importador
+import ocr
+import precios
+import busqueda
+import cotizacion
+import cotizacion_pdf
+import traduccion
 
 # ==========================================
 # 1. CONFIGURACIÓN E INICIALIZACIÓN
@@ -23,21 +27,24 @@ def obtener_hora_mx(): return datetime.now(tz_cdmx) if tz_cdmx else datetime.now
 # Inicialización de Sesión
 def init_session():
     defaults = {
-        'carrito': [],
+        'carrito': cotizacion.Cotizacion(),
         'cliente': "",
         'vin': "",
         'orden': "",
         'asesor': "",
         'ver_preview': False,
         'nieve_activa': False,
-        'mensaje_exito': ""
+        'mensaje_exito': "",
+        'errores_carga': [],
+        'tiempos_pdf': [],
+        'pdf_pedido': ""
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
 def limpiar_todo():
-    st.session_state.carrito = []
+    st.session_state.carrito = cotizacion.Cotizacion()
     st.session_state.cliente = ""
     st.session_state.vin = ""
     st.session_state.orden = ""
@@ -45,6 +52,9 @@ def limpiar_todo():
     st.session_state.ver_preview = False
     st.session_state.nieve_activa = False
     st.session_state.mensaje_exito = ""
+    st.session_state.errores_carga = []
+    st.session_state.tiempos_pdf = []
+    st.session_state.pdf_pedido = ""
 
 init_session()
 
@@ -118,87 +128,58 @@ if st.session_state.nieve_activa:
 # ==========================================
 # 3. LÓGICA DE DATOS
 # ==========================================
-@st.cache_data(show_spinner="Cargando catálogo...")
-def cargar_catalogo():
-    archivo_zip = "base_datos_2026.zip"
-    archivo_parquet = "base_datos_2026.parquet"
-    if os.path.exists(archivo_parquet):
-        try:
-            df = pd.read_parquet(archivo_parquet)
-            c_sku = next((c for c in df.columns if c == 'ITEM' or 'PART' in c), None)
-            c_desc = next((c for c in df.columns if 'DESC' in c), None)
-            return df, c_sku, c_desc
-        except: pass
-    if not os.path.exists(archivo_zip): return None, None, None
-    try:
-        with zipfile.ZipFile(archivo_zip, "r") as z:
-            archivos_validos = [f for f in z.namelist() if f.endswith(('.xlsx','.xls','.csv')) and not f.startswith('~')]
-            if not archivos_validos: return None, None, None
-            with z.open(archivos_validos[0]) as f:
-                if archivos_validos[0].endswith('.csv'): df = pd.read_csv(f, dtype=str, encoding='latin-1')
-                else: df = pd.read_excel(f, dtype=str)
-        df.dropna(how='all', inplace=True)
-        df.columns = [str(c).strip().upper() for c in df.columns]
-        c_sku = next((c for c in df.columns if c == 'ITEM' or 'SKU' in c), None)
-        c_desc = next((c for c in df.columns if 'DESC' in c), None)
-        c_precio = next((c for c in df.columns if 'PRECIO' in c or 'TOTAL' in c), None)
-        if not c_sku or not c_precio: return None, None, None
-        df.drop_duplicates(subset=[c_sku], keep='first', inplace=True)
-        df['SKU_CLEAN'] = df[c_sku].astype(str).str.replace('-', '').str.strip().str.upper()
-        df['PRECIO_NUM'] = df[c_precio].apply(lambda x: float(str(x).replace('$','').replace(',','').strip()) if str(x).replace('$','').replace(',','').strip() else 0.0)
-        df.to_parquet(archivo_parquet)
-        return df, c_sku, c_desc
-    except: return None, None, None
-
-if 'df_maestro' not in st.session_state:
-    st.session_state.df_maestro, st.session_state.col_sku_db, st.session_state.col_desc_db = cargar_catalogo()
-
-df_db = st.session_state.df_maestro
-col_sku_db = st.session_state.col_sku_db
-col_desc_db = st.session_state.col_desc_db
-
-def analizador_inteligente_archivos(df_raw):
-    hallazgos = []; metadata = {}
-    df = df_raw.fillna('').astype(str).apply(lambda x: x.str.upper().str.strip())
-    patron_vin = r'\b[A-HJ-NPR-Z0-9]{17}\b'
-    patron_orden = r'\b\d{8}\b'
-    patron_sku_flex = r'\b[A-Z0-9]{5}-?[A-Z0-9]{5}(?:-?[A-Z0-9]{2})?\b' 
-    for r_idx, row in df.iterrows():
-        for c_idx, val in row.items():
-            val_str = str(val)
-            if 'VIN' not in metadata:
-                m = re.search(patron_vin, val_str)
-                if m: metadata['VIN'] = m.group(0)
-            if 'ORDEN' not in metadata:
-                m = re.search(patron_orden, val_str)
-                if m: metadata['ORDEN'] = m.group(0)
-            if re.match(patron_sku_flex, val_str) and len(val_str.replace('-','')) in [10, 12] and val_str != metadata.get('VIN', ''):
-                cant = 1
-                try:
-                    col_pos = df.columns.get_loc(c_idx)
-                    if col_pos + 1 < len(df.columns):
-                        vecino = str(df.iloc[r_idx, col_pos + 1]).replace('.0', '').strip()
-                        if vecino.isdigit(): cant = int(vecino)
-                except: pass
-                hallazgos.append({'sku': val_str, 'cant': cant})
-    return hallazgos, metadata
-
-def agregar_item_callback(sku, desc_raw, precio_base, cant, tipo, prioridad="Medio", abasto="⚠️ REVISAR", traducir=True):
-    if traducir:
-        try: desc = GoogleTranslator(source='en', target='es').translate(str(desc_raw))
-        except: desc = str(desc_raw)
-    else: desc = str(desc_raw)
-    iva_monto = (precio_base * cant) * 0.16
-    total_linea = (precio_base * cant) + iva_monto
-    st.session_state.carrito.append({
-        "SKU": sku, "Descripción": desc, "Prioridad": prioridad, "Abasto": abasto, "Tiempo Entrega": "",
-        "Cantidad": cant, "Precio Base": precio_base, "Precio Unitario (c/IVA)": precio_base * 1.16,
-        "IVA": iva_monto, "Importe Total": total_linea, "Estatus": "Disponible", "Tipo": tipo,
-        "Seleccionado": True
-    })
+# Catálogo + índice de búsqueda (prefijo de SKU + trigramas) por proceso. El hilo de fondo se
+# arranca con la primera sesión, arma la versión sin bloquearla y calienta las traducciones; luego
+# revisa el zip y los deltas y publica la versión nueva completa fuera del request. Cada rerun
+# toma la versión vigente; un delta que solo cambia precios reutiliza el índice.
+# memory-map: todas las sesiones comparten el mismo catálogo de solo lectura.
+@st.cache_resource
+def catalogo_vivo():
+    return catalogo.CatalogoVivo(
+        indexar=lambda df, c_sku, c_desc: busqueda.IndiceBusqueda(df['SKU_CLEAN'], df[c_desc]),
+        calentar=[traduccion.calentar],
+    ).iniciar()
+
+# Aviso mientras el hilo de fondo arma el catálogo: se revisa solo cada 2 s y recarga la app al estar listo
+@st.fragment(run_every=2)
+def aviso_catalogo_cargando():
+    if catalogo_vivo().listo.is_set(): st.rerun()
+    st.info("⏳ Cargando catálogo... La búsqueda se activa en unos segundos; mientras tanto puedes capturar partidas manuales.")
+
+# Motor OCR: se carga una vez por proceso (easyocr tarda segundos en iniciar)
+@st.cache_resource(show_spinner="Cargando motor OCR...")
+def cargar_ocr():
+    return ocr.crear_lector()
+
+# Filas leídas de una foto, por huella (sha256) de la imagen: volver a subirla no repite el OCR
+@st.cache_data(max_entries=32, show_spinner=False)
+def leer_imagen(huella, _datos):
+    return ocr.filas_imagen(cargar_ocr(), _datos)
+
+# Precios por lote por huella (sha256) de la lista y firma del catálogo: los reruns (clics en el
+# carrito, búsqueda, fragmentos) no vuelven a leer el archivo ni a cruzarlo contra el catálogo
+@st.cache_data(max_entries=16, show_spinner=False)
+def precios_lote(huella, firma, nombre, _archivo, _version):
+    resultado = precios.cotizar_lote(precios.leer_lista(_archivo, nombre), _version.df, _version.c_sku, _version.c_desc)
+    return int(resultado['ENCONTRADO'].sum()), len(resultado), precios.a_csv(resultado)
+
+listo_db = catalogo_vivo().listo.is_set()  # Antes de leer la versión: si ya estaba listo, la versión es la buena
+version_db = catalogo_vivo().vigente()
+df_db, col_sku_db, col_desc_db, indice_db = version_db.df, version_db.c_sku, version_db.c_desc, version_db.indice
+
+def agregar_item_callback(sku, desc_raw, precio_base, cant, tipo, prioridad="Medio", abasto="⚠️ REVISAR", traducir=True, desc_es=None):
+    # desc_es: DESC_ES pretraducida del catálogo (python traduccion.py); si no hay, se traduce aquí
+    desc = desc_es or (traduccion.traducir(desc_raw) if traducir else str(desc_raw))
+    st.session_state.carrito.agregar(cotizacion.LineaCotizacion(
+        str(sku), desc, cotizacion.a_centavos(precio_base), int(cant), cotizacion.Tipo(tipo),
+        cotizacion.Prioridad(prioridad), cotizacion.Abasto.desde_texto(abasto)))
 
 def toggle_preview(): st.session_state.ver_preview = not st.session_state.ver_preview
 
+MARCA_PRIORIDAD = {cotizacion.Prioridad.URGENTE: "🔴", cotizacion.Prioridad.MEDIO: "🔵", cotizacion.Prioridad.BAJO: "⚪"}
+OPCIONES_PRIORIDAD = {f"{marca} {p.value}": p for p, marca in MARCA_PRIORIDAD.items()}
+OPCIONES_ABASTO = {"✅ Disponible": cotizacion.Abasto.DISPONIBLE, "📦 Pedido": cotizacion.Abasto.PEDIDO, "⚫ Back Order": cotizacion.Abasto.BACK_ORDER, "⚠️ REVISAR": cotizacion.Abasto.REVISAR}
+
 # ==========================================
 # 4. FUNCIONES DE EXPORTACIÓN (WHATSAPP Y JSON)
 # ==========================================
@@ -209,57 +190,39 @@ def generar_link_whatsapp():
     msg = f"🚗 *PRESUPUESTO TOYOTA LOS FUERTES*\n"
     msg += f"👤 Cliente: {cliente}\n📋 Orden: {orden}\n\n"
     
-    items_activos = [i for i in st.session_state.carrito if i.get('Seleccionado', True)]
-    refacciones = [i for i in items_activos if i['Tipo'] != "Mano de Obra"]
-    mano_obra = [i for i in items_activos if i['Tipo'] == "Mano de Obra"]
-    
-    total_gral = 0
+    carrito = st.session_state.carrito; titulo_refacciones = True
+    for grupo, lineas in carrito.por_grupo():
+        if grupo is cotizacion.Tipo.MANO_OBRA:
+            msg += "\n*--- SERVICIOS ---*\n"
+            for linea in lineas: msg += f"🛠️ {linea.descripcion} (${cotizacion.a_pesos(linea.importe):,.2f})\n"
+        else:
+            if titulo_refacciones: msg += "*--- REFACCIONES ---*\n"; titulo_refacciones = False
+            msg += f"\n{MARCA_PRIORIDAD[grupo]} *{grupo.value.upper()}*\n"
+            for linea in lineas: msg += f"▪️ {linea.cantidad}x {linea.descripcion} (${cotizacion.a_pesos(linea.importe):,.2f})\n"
+        msg += f"   _Subtotal: ${cotizacion.a_pesos(carrito.subtotal(grupo)):,.2f}_\n"
     
-    # 1. REFACCIONES
-    if refacciones:
-        msg += "*--- REFACCIONES ---*\n"
-        for prio in ['Urgente', 'Medio', 'Bajo']:
-            grupo = [i for i in refacciones if i['Prioridad'] == prio]
-            if grupo:
-                msg += f"\n🔴 *{prio.upper()}*\n" if prio == "Urgente" else (f"\n🔵 *{prio.upper()}*\n" if prio == "Medio" else f"\n⚪ *{prio.upper()}*\n")
-                subtotal = 0
-                for item in grupo:
-                    total_item = item['Importe Total']
-                    subtotal += total_item
-                    msg += f"▪️ {item['Cantidad']}x {item['Descripción']} (${total_item:,.2f})\n"
-                msg += f"   _Subtotal: ${subtotal:,.2f}_\n"
-                total_gral += subtotal
-
-    # 2. MANO DE OBRA
-    if mano_obra:
-        msg += "\n*--- SERVICIOS ---*\n"
-        subtotal_mo = 0
-        for item in mano_obra:
-            total_item = item['Importe Total']
-            subtotal_mo += total_item
-            msg += f"🛠️ {item['Descripción']} (${total_item:,.2f})\n"
-        msg += f"   _Subtotal: ${subtotal_mo:,.2f}_\n"
-        total_gral += subtotal_mo
-    
-    msg += f"\n💰 *GRAN TOTAL: ${total_gral:,.2f}* (IVA Incluido)"
+    msg += f"\n💰 *GRAN TOTAL: ${cotizacion.a_pesos(carrito.total):,.2f}* (IVA Incluido)"
     
     return f"https://wa.me/?text={urllib.parse.quote(msg)}"
 
-def descargar_sesion_json():
-    # Crear diccionario con todo el estado
-    estado = {
+def estado_sesion():
+    # Lo que recibe cotizacion_pdf.generar_pdf; en el JSON el carrito va como lista de dicts
+    return {
         'carrito': st.session_state.carrito,
         'cliente': st.session_state.cliente,
         'vin': st.session_state.vin,
         'orden': st.session_state.orden,
         'asesor': st.session_state.asesor
     }
-    return json.dumps(estado, indent=2)
+
+def descargar_sesion_json():
+    estado = estado_sesion()
+    return json.dumps(dict(estado, carrito=estado['carrito'].a_dicts()), indent=2)
 
 def cargar_sesion_json(archivo):
     try:
         estado = json.load(archivo)
-        st.session_state.carrito = estado.get('carrito', [])
+        st.session_state.carrito = cotizacion.Cotizacion.desde_dicts(estado.get('carrito', []))
         st.session_state.cliente = estado.get('cliente', "")
         st.session_state.vin = estado.get('vin', "")
         st.session_state.orden = estado.get('orden', "")
@@ -272,150 +235,25 @@ def cargar_sesion_json(archivo):
 # ==========================================
 # 5. GENERADOR PDF
 # ==========================================
-class PDF(FPDF):
-    def header(self):
-        if os.path.exists("logo.png"):
-            try: self.image("logo.png", 10, 8, 33)
-            except: pass
-        self.set_font('Arial', 'B', 16); self.set_text_color(235, 10, 30)
-        self.cell(0, 10, 'TOYOTA LOS FUERTES', 0, 1, 'C')
-        self.set_font('Arial', '', 10); self.set_text_color(0)
-        self.cell(0, 5, 'PRESUPUESTO DE SERVICIOS Y REFACCIONES', 0, 1, 'C'); self.ln(15)
-    def footer(self):
-        self.set_y(-75)
-        self.set_font('Arial', 'B', 7); self.set_text_color(0)
-        self.cell(0, 4, 'TÉRMINOS, GARANTÍAS Y MARCO LEGAL (LFPC Y NOM-174-SCFI-2007)', 0, 1, 'L')
-        self.set_font('Arial', '', 6); self.set_text_color(40)
-        legales = (
-            "1. PRECIOS: En Moneda Nacional (MXN) con IVA incluido (Art. 7 LFPC). Válido por 24 horas.\n"
-            "2. GARANTÍA: 12 meses o 20,000 km en refacciones instaladas en taller (Art. 77 LFPC). "
-            "Partes eléctricas sujetas a diagnóstico.\n"
-            "3. PEDIDOS: Requieren 100% anticipo. Cancelaciones imputables al cliente aplican pena del 20%.\n"
-            "4. CLÁUSULAS: Este contrato NO contiene cláusulas abusivas, inequitativas o desproporcionadas (Art. 85 LFPC).\n"
-            "5. ACEPTACIÓN: La firma o confirmación vía electrónica (WhatsApp/Correo) constituye aceptación total."
-        )
-        self.multi_cell(0, 3, legales, 0, 'J')
-        self.ln(5); y_firma = self.get_y()
-        self.line(10, y_firma, 80, y_firma); self.line(110, y_firma, 190, y_firma)
-        self.cell(90, 3, "ASESOR DE SERVICIO", 0, 0, 'C'); self.cell(90, 3, "CLIENTE (NOMBRE Y FIRMA)", 0, 1, 'C')
-        self.set_y(-12); self.set_font('Arial', 'B', 8); self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'R')
-
-def generar_pdf():
-    pdf = PDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=80)
-    cli_safe = str(st.session_state.cliente).encode('latin-1', 'replace').decode('latin-1')
-    vin_safe = str(st.session_state.vin).encode('latin-1', 'replace').decode('latin-1')
-    ord_safe = str(st.session_state.orden).encode('latin-1', 'replace').decode('latin-1')
-    pdf.set_text_color(0,0,0); pdf.set_font('Arial', 'B', 10)
-    pdf.cell(20, 5, 'CLIENTE:', 0, 0); pdf.set_font('Arial', '', 10); pdf.cell(100, 5, cli_safe[:60], 0, 0)
-    pdf.set_font('Arial', 'B', 10); pdf.cell(20, 5, 'FECHA:', 0, 0); pdf.set_font('Arial', '', 10); pdf.cell(40, 5, obtener_hora_mx().strftime("%d/%m/%Y"), 0, 1)
-    pdf.cell(20, 5, 'VIN:', 0, 0); pdf.cell(100, 5, vin_safe, 0, 0)
-    pdf.cell(20, 5, 'ORDEN:', 0, 0); pdf.cell(40, 5, ord_safe, 0, 1)
-    pdf.ln(5)
-    items_activos = [i for i in st.session_state.carrito if i.get('Seleccionado', True)]
-    refacciones = [i for i in items_activos if i['Tipo'] != "Mano de Obra"]
-    mano_obra = [i for i in items_activos if i['Tipo'] == "Mano de Obra"]
-    orden_prioridad = ['Urgente', 'Medio', 'Bajo']
-    cols = [20, 55, 18, 25, 10, 20, 17, 20]
-    headers = ['CÓDIGO', 'DESCRIPCIÓN', 'ESTATUS', 'T.ENTREGA', 'CANT', 'UNITARIO', 'IVA', 'TOTAL']
-    total_gral_pdf = 0; hay_pedido = False; hay_backorder = False
-
-    # --- REFACCIONES ---
-    if refacciones:
-        for prio in orden_prioridad:
-            grupo = [i for i in refacciones if i['Prioridad'] == prio]
-            if not grupo: continue
-            pdf.ln(2)
-            if prio == "Urgente": pdf.set_fill_color(211, 47, 47) 
-            elif prio == "Medio": pdf.set_fill_color(25, 118, 210)
-            else: pdf.set_fill_color(117, 117, 117)
-            pdf.set_font('Arial', 'B', 9); pdf.set_text_color(255, 255, 255)
-            pdf.cell(0, 6, f" REFACCIONES - {prio.upper()} ", 0, 1, 'L', True)
-            pdf.set_fill_color(240, 240, 240); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', 'B', 7)
-            for i, h in enumerate(headers): pdf.cell(cols[i], 8, h, 1, 0, 'C', True)
-            pdf.ln(); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', '', 8)
-            subtotal_grupo = 0
-            for item in grupo:
-                subtotal_grupo += item['Importe Total']
-                if "Pedido" in item['Abasto'] or "Back" in item['Abasto']: hay_pedido = True
-                if "Back" in item['Abasto']: hay_backorder = True
-                sku = item['SKU'][:15]; desc = str(item['Descripción']).encode('latin-1','replace').decode('latin-1')
-                st_txt = item['Abasto'].replace("⚠️ ", "").replace("✅ ", "").replace("📦 ", "").replace("⚫ ", "")
-                col_desc_w = cols[1] - 2; text_len = pdf.get_string_width(desc)
-                lines_needed = int(math.ceil(text_len / col_desc_w)); lines_needed = max(1, lines_needed)
-                row_height = max(6, lines_needed * 4)
-                if pdf.get_y() + row_height > 250:
-                    pdf.add_page(); pdf.set_fill_color(240, 240, 240); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', 'B', 7)
-                    for i, h in enumerate(headers): pdf.cell(cols[i], 8, h, 1, 0, 'C', True)
-                    pdf.ln(); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', '', 8)
-                y_start = pdf.get_y(); x_start = pdf.get_x()
-                pdf.cell(cols[0], row_height, sku, 1, 0, 'C')
-                x_desc = pdf.get_x(); pdf.multi_cell(cols[1], 4, desc, 1, 'L'); pdf.set_xy(x_desc + cols[1], y_start)
-                if "Disponible" in item['Abasto']: pdf.set_fill_color(200, 230, 201)
-                elif "Pedido" in item['Abasto']: pdf.set_fill_color(255, 224, 178)
-                elif "Back" in item['Abasto']: pdf.set_fill_color(33, 33, 33); pdf.set_text_color(255, 255, 255)
-                else: pdf.set_fill_color(255, 205, 210)
-                pdf.cell(cols[2], row_height, st_txt, 1, 0, 'C', True); pdf.set_text_color(0, 0, 0)
-                pdf.cell(cols[3], row_height, str(item['Tiempo Entrega'])[:12], 1, 0, 'C')
-                pdf.cell(cols[4], row_height, str(item['Cantidad']), 1, 0, 'C')
-                pdf.cell(cols[5], row_height, f"${item['Precio Base']:,.2f}", 1, 0, 'R')
-                pdf.cell(cols[6], row_height, f"${item['IVA']/item['Cantidad']:,.2f}", 1, 0, 'R')
-                pdf.cell(cols[7], row_height, f"${item['Importe Total']:,.2f}", 1, 1, 'R')
-            pdf.set_font('Arial', 'B', 8)
-            pdf.cell(165, 5, f"SUBTOTAL REFACCIONES ({prio.upper()}):", 0, 0, 'R')
-            pdf.cell(20, 5, f"${subtotal_grupo:,.2f}", 1, 1, 'R')
-            total_gral_pdf += subtotal_grupo
-
-    # --- MANO DE OBRA ---
-    if mano_obra:
-        pdf.ln(4); pdf.set_fill_color(50, 50, 50); pdf.set_font('Arial', 'B', 9); pdf.set_text_color(255, 255, 255)
-        pdf.cell(0, 6, " MANO DE OBRA / SERVICIOS ", 0, 1, 'L', True)
-        pdf.set_fill_color(240, 240, 240); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', 'B', 7)
-        for i, h in enumerate(headers): pdf.cell(cols[i], 8, h, 1, 0, 'C', True)
-        pdf.ln(); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', '', 8)
-        subtotal_mo = 0
-        for item in mano_obra:
-            subtotal_mo += item['Importe Total']
-            sku = item['SKU'][:15]; desc = str(item['Descripción']).encode('latin-1','replace').decode('latin-1')
-            col_desc_w = cols[1] - 2; text_len = pdf.get_string_width(desc)
-            lines_needed = int(math.ceil(text_len / col_desc_w)); lines_needed = max(1, lines_needed)
-            row_height = max(6, lines_needed * 4)
-            if pdf.get_y() + row_height > 250:
-                pdf.add_page(); pdf.set_fill_color(240, 240, 240); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', 'B', 7)
-                for i, h in enumerate(headers): pdf.cell(cols[i], 8, h, 1, 0, 'C', True)
-                pdf.ln(); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', '', 8)
-            y_start = pdf.get_y(); x_start = pdf.get_x()
-            pdf.cell(cols[0], row_height, sku, 1, 0, 'C')
-            x_desc = pdf.get_x(); pdf.multi_cell(cols[1], 4, desc, 1, 'L'); pdf.set_xy(x_desc + cols[1], y_start)
-            pdf.set_fill_color(230, 230, 230)
-            pdf.cell(cols[2], row_height, "SERVICIO", 1, 0, 'C', True)
-            pdf.cell(cols[3], row_height, "-", 1, 0, 'C')
-            pdf.cell(cols[4], row_height, "1", 1, 0, 'C')
-            pdf.cell(cols[5], row_height, f"${item['Precio Base']:,.2f}", 1, 0, 'R')
-            pdf.cell(cols[6], row_height, f"${item['IVA']/item['Cantidad']:,.2f}", 1, 0, 'R')
-            pdf.cell(cols[7], row_height, f"${item['Importe Total']:,.2f}", 1, 1, 'R')
-        pdf.set_font('Arial', 'B', 8)
-        pdf.cell(165, 5, f"SUBTOTAL MANO DE OBRA:", 0, 0, 'R')
-        pdf.cell(20, 5, f"${subtotal_mo:,.2f}", 1, 1, 'R')
-        total_gral_pdf += subtotal_mo
-
-    pdf.ln(5)
-    if hay_pedido: 
-        pdf.set_text_color(230, 81, 0); pdf.set_font('Arial', 'B', 9)
-        pdf.cell(0, 4, "** REQUIERE ANTICIPO DEL 100% POR PIEZAS DE PEDIDO **", 0, 1, 'R')
-    if hay_backorder:
-        pdf.set_text_color(183, 28, 28); pdf.set_font('Arial', 'B', 9)
-        pdf.cell(0, 4, "(!) REFACCIONES EN BACK ORDER: CONSULTAR TIEMPO DE ESPERA CON ASESOR", 0, 1, 'R')
-    pdf.ln(5); pdf.set_text_color(0, 0, 0); pdf.set_font('Arial', 'B', 14)
-    pdf.cell(145, 10, 'GRAN TOTAL (IVA INCLUIDO):', 0, 0, 'R')
-    pdf.cell(45, 10, f"${total_gral_pdf:,.2f}", 0, 1, 'R')
-    return pdf.output(dest='S').encode('latin-1')
+def huella_cotizacion(fecha):
+    """Llave estable del PDF: partidas activas + cliente/VIN/orden + fecha (también va impresa)."""
+    estado = {
+        'carrito': st.session_state.carrito.a_dicts(solo_seleccionadas=True),
+        'cliente': st.session_state.cliente, 'vin': st.session_state.vin, 'orden': st.session_state.orden,
+        'fecha': fecha,
+    }
+    return hashlib.sha256(json.dumps(estado, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+# Un PDF por estado distinto de la cotización: la huella ya resume _cotizacion
+@st.cache_data(max_entries=64, show_spinner=False)
+def pdf_cotizacion(huella, fecha, _cotizacion):
+    return cotizacion_pdf.generar_pdf(_cotizacion, fecha)
 
 # ==========================================
 # 6. UI PRINCIPAL
 # ==========================================
-if df_db is None: st.warning(f"⚠️ Atención: No se encontró base de datos.")
+if not listo_db: aviso_catalogo_cargando()
+elif df_db is None: st.warning(f"⚠️ Atención: No se encontró base de datos.")
 
 if st.session_state.mensaje_exito:
     st.success(st.session_state.mensaje_exito)
@@ -431,36 +269,55 @@ with st.sidebar:
     st.session_state.asesor = st.text_input("Asesor", st.session_state.asesor)
     
     st.divider(); st.markdown("### 🤖 Carga Inteligente")
-    uploaded_file = st.file_uploader("Excel (XLSX, XLSM, XLS, CSV)", type=['xlsx', 'xlsm', 'xls', 'csv'], label_visibility="collapsed")
+    uploaded_file = st.file_uploader("Excel (XLSX, XLSM, XLS, CSV), PDF o foto", type=['xlsx', 'xlsm', 'xls', 'csv', 'pdf', 'jpg', 'jpeg', 'png'], label_visibility="collapsed")
     if uploaded_file and st.button("ANALIZAR ARCHIVO", type="primary"):
-        try:
-            if uploaded_file.name.endswith('.csv'):
-                df_dict = {'Hoja1': pd.read_csv(uploaded_file, encoding='latin-1', on_bad_lines='skip')}
-            else:
-                df_dict = pd.read_excel(uploaded_file, sheet_name=None)
-            
-            found_total = 0; target_df = None
-            if 'RESUMEN_DATOS' in df_dict: target_df = df_dict['RESUMEN_DATOS']
-            else: first_sheet = list(df_dict.keys())[0]; target_df = df_dict[first_sheet]
-            
-            items, meta = analizador_inteligente_archivos(target_df)
-            if 'CLIENTE' in meta and not st.session_state.cliente: st.session_state.cliente = meta['CLIENTE']
-            if 'VIN' in meta and not st.session_state.vin: st.session_state.vin = meta['VIN']
-            if 'ORDEN' in meta and not st.session_state.orden: st.session_state.orden = meta['ORDEN']
-            
-            for it in items:
-                clean = str(it['sku']).upper().replace('-', '').strip()
-                if df_db is not None:
-                    match = df_db[df_db['SKU_CLEAN'] == clean]
-                    if not match.empty:
-                        row = match.iloc[0]
-                        agregar_item_callback(row[col_sku_db], row[col_desc_db], row['PRECIO_NUM'], it['cant'], "Refacción")
-                        found_total += 1
-            if found_total > 0:
-                st.session_state.mensaje_exito = f"✅ Se importaron {found_total} partidas exitosamente."
-                st.rerun()
-            else: st.warning("⚠️ No se detectaron números de parte válidos.")
-        except Exception as e: st.error(f"Error procesando archivo: {e}")
+        with st.status("Procesando...", expanded=False) as status:
+            try:
+                # Solo la hoja RESUMEN_DATOS (o la primera), fila por fila y hasta MAX_FILAS_IMPORTACION
+                # PDF: páginas en paralelo; el desglose de tiempos queda en tiempos_pdf
+                found_total = 0; st.session_state.tiempos_pdf = []
+                if uploaded_file.name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                    datos = uploaded_file.getvalue(); filas = leer_imagen(ocr.huella(datos), datos)
+                else:
+                    filas = importador.leer_filas(uploaded_file, uploaded_file.name, tiempos=st.session_state.tiempos_pdf)
+                items, meta = importador.analizar_filas(filas)
+                if 'CLIENTE' in meta and not st.session_state.cliente: st.session_state.cliente = meta['CLIENTE']
+                if 'VIN' in meta and not st.session_state.vin: st.session_state.vin = meta['VIN']
+                if 'ORDEN' in meta and not st.session_state.orden: st.session_state.orden = meta['ORDEN']
+                
+                encontrados, fallos, duplicados = importador.cruzar_con_catalogo(items, df_db)
+                st.session_state.errores_carga = fallos + [f"{sku} (repetido en el archivo, se importó cada vez)" for sku in duplicados]
+
+                # Traducción concurrente de las descripciones que no vienen pretraducidas
+                barra = st.progress(0.0, text="Traduciendo descripciones...")
+                por_traducir = [row[col_desc_db] for _, row in encontrados.iterrows() if not catalogo.descripcion_es(row)]
+                traducidas = traduccion.traducir_varios(por_traducir, progreso=lambda h, n: barra.progress(h / n if n else 1.0, text=f"Traduciendo {h}/{n}..."))
+                for _, row in encontrados.iterrows():
+                    desc_es = catalogo.descripcion_es(row) or traducidas.get(str(row[col_desc_db]))
+                    agregar_item_callback(row[col_sku_db], row[col_desc_db], row['PRECIO_NUM'], int(row['CANT_IMPORTADA']), "Refacción", traducir=False, desc_es=desc_es)
+                    found_total += 1
+                if found_total > 0:
+                    st.session_state.mensaje_exito = f"✅ Se importaron {found_total} partidas exitosamente."
+                    status.update(label=f"✅ {found_total} partidas importadas", state="complete")
+                    st.rerun()
+                else:
+                    status.update(label="Sin partidas", state="error")
+                    st.warning("⚠️ No se detectaron números de parte válidos.")
+            except Exception as e: st.error(f"Error procesando archivo: {e}")
+    if st.session_state.errores_carga:
+        with st.expander(f"⚠️ {len(st.session_state.errores_carga)} partidas sin importar / revisar"):
+            st.write("\n".join(f"- {e}" for e in st.session_state.errores_carga))
+    if st.session_state.tiempos_pdf:
+        with st.expander(f"⏱️ PDF: {len(st.session_state.tiempos_pdf)} páginas en {sum(t[1] for t in st.session_state.tiempos_pdf):.1f} s"):
+            st.dataframe(pd.DataFrame(st.session_state.tiempos_pdf, columns=["Página", "Segundos", "Filas"]), hide_index=True, use_container_width=True)
+
+    st.divider(); st.markdown("### 💲 Precios por Lote")
+    lista_file = st.file_uploader("Lista de SKUs (CSV / Excel)", type=['csv', 'xlsx', 'xls'], key="lista_precios", label_visibility="collapsed")
+    if lista_file is not None and df_db is not None:
+        # Un solo merge contra el catálogo: 10k SKUs en milisegundos (y una vez por archivo y versión)
+        encontrados, total, csv = precios_lote(hashlib.sha256(lista_file.getvalue()).hexdigest(), version_db.firma, lista_file.name, lista_file, version_db)
+        st.caption(f"{encontrados:,} de {total:,} SKUs encontrados")
+        st.download_button("DESCARGAR PRECIOS (CSV)", csv, file_name="precios_lote.csv", mime="text/csv")
     
     st.divider(); st.markdown("### 💾 Guardar / Cargar")
     
@@ -485,14 +342,13 @@ with st.expander("🔎 AÑADIR CONCEPTOS", expanded=True):
         c_search, c_btn = st.columns([3, 1])
         q = c_search.text_input("Buscar Refacción", placeholder="Nombre o SKU...", label_visibility="collapsed")
         if q and df_db is not None:
-            mask = df_db.apply(lambda x: x.astype(str).str.contains(q, case=False)).any(axis=1)
-            results = df_db[mask].head(3)
+            results = df_db.iloc[busqueda.top_k(df_db, indice_db, q, [col_sku_db, col_desc_db, 'PRECIO_NUM'])]
             if not results.empty:
                 for _, row in results.iterrows():
                     rc1, rc2, rc3 = st.columns([2, 1, 1])
                     rc1.markdown(f"**{row[col_sku_db]}**")
                     rc2.markdown(f"${row['PRECIO_NUM']:,.2f}")
-                    rc3.button("AGREGAR", key=f"add_{row[col_sku_db]}", type="primary", on_click=agregar_item_callback, args=(row[col_sku_db], row[col_desc_db], row['PRECIO_NUM'], 1, "Refacción"))
+                    rc3.button("AGREGAR", key=f"add_{row[col_sku_db]}", type="primary", on_click=agregar_item_callback, args=(row[col_sku_db], row[col_desc_db], row['PRECIO_NUM'], 1, "Refacción"), kwargs={'desc_es': catalogo.descripcion_es(row)})
             else: st.info("Sin resultados.")
     with tab2:
         with st.form("manual_ref"):
@@ -517,65 +373,60 @@ st.divider()
 st.subheader(f"🛒 Carrito ({len(st.session_state.carrito)})")
 
 if st.session_state.carrito:
-    def actualizar_cantidad_input(idx, key):
-        val = st.session_state[key]
-        st.session_state.carrito[idx]['Cantidad'] = val
-        it = st.session_state.carrito[idx]
-        it['IVA'] = (it['Precio Base'] * it['Cantidad']) * 0.16
-        it['Importe Total'] = (it['Precio Base'] * it['Cantidad']) + it['IVA']
-    def eliminar_item(idx): st.session_state.carrito.pop(idx)
-    def update_val(idx, k, w): st.session_state.carrito[idx][k] = st.session_state[w].replace("🔴 ", "").replace("🔵 ", "").replace("⚪ ", "").replace("✅ ", "").replace("📦 ", "").replace("⚫ ", "").replace("⚠️ ", "")
-    def update_chk(idx, k): st.session_state.carrito[idx]['Seleccionado'] = st.session_state[k]
-
-    for i, item in enumerate(st.session_state.carrito):
-        if 'Seleccionado' not in item: item['Seleccionado'] = True
+    # Todo cambio pasa por la Cotizacion, que ajusta sus subtotales en el momento
+    def actualizar_campo(idx, campo, key, opciones=None):
+        valor = st.session_state[key]
+        st.session_state.carrito.modificar(idx, **{campo: opciones[valor] if opciones else valor})
+    def eliminar_item(idx): st.session_state.carrito.quitar(idx)
+    prioridades, abastos = list(OPCIONES_PRIORIDAD.values()), list(OPCIONES_ABASTO.values())
+
+    for i, linea in enumerate(st.session_state.carrito):
         with st.container(border=True):
             c_check, c_desc, c_tot, c_del = st.columns([0.5, 3, 1, 0.3])
-            c_check.checkbox("", value=item['Seleccionado'], key=f"sel_{i}", on_change=update_chk, args=(i, f"sel_{i}"))
+            c_check.checkbox("", value=linea.seleccionado, key=f"sel_{i}", on_change=actualizar_campo, args=(i, 'seleccionado', f"sel_{i}"))
             
             with c_desc:
-                if item['Tipo'] == "Mano de Obra":
-                    st.markdown(f"<h3 style='color:#000; margin:0; padding:0; font-size:18px;'>🛠️ {item['Descripción']}</h3>", unsafe_allow_html=True)
+                if linea.tipo is cotizacion.Tipo.MANO_OBRA:
+                    st.markdown(f"<h3 style='color:#000; margin:0; padding:0; font-size:18px;'>🛠️ {linea.descripcion}</h3>", unsafe_allow_html=True)
                     st.caption("Servicio de Taller")
                 else:
-                    st.markdown(f"**{item['Descripción']}** | {item['SKU']}"); st.caption(f"Unit: ${item['Precio Unitario (c/IVA)']:,.2f}")
+                    st.markdown(f"**{linea.descripcion}** | {linea.sku}"); st.caption(f"Unit: ${cotizacion.a_pesos(linea.unitario_con_iva):,.2f}")
             
             with c_tot: 
-                color_tot = "inherit" if item['Seleccionado'] else "#888" 
-                st.markdown(f"<div style='text-align:right; color:{color_tot}; font-weight:900;'>${item['Importe Total']:,.2f}</div>", unsafe_allow_html=True)
+                color_tot = "inherit" if linea.seleccionado else "#888" 
+                st.markdown(f"<div style='text-align:right; color:{color_tot}; font-weight:900;'>${cotizacion.a_pesos(linea.importe):,.2f}</div>", unsafe_allow_html=True)
             c_del.button("🗑️", key=f"d_{i}", on_click=eliminar_item, args=(i,), type="tertiary")
             
-            if item['Seleccionado']:
+            if linea.seleccionado:
                 cp, cs, ct, cq = st.columns([1.3, 1.3, 1.5, 1.8])
-                if item['Tipo'] == "Mano de Obra":
+                if linea.tipo is cotizacion.Tipo.MANO_OBRA:
                     cp.markdown("<div class='static-badge'>SERVICIO</div>", unsafe_allow_html=True)
                     cs.markdown("<div class='static-badge'>TALLER</div>", unsafe_allow_html=True)
-                    ct.markdown(f"<div style='text-align:center; padding-top:10px; font-weight:bold; color:#444;'>{item['Tiempo Entrega'] or '-'}</div>", unsafe_allow_html=True)
+                    ct.markdown(f"<div style='text-align:center; padding-top:10px; font-weight:bold; color:#444;'>{linea.tiempo_entrega or '-'}</div>", unsafe_allow_html=True)
                     cq.markdown(f"<div style='text-align:center; padding-top:10px; font-weight:bold; color:#444;'></div>", unsafe_allow_html=True)
                 else:
-                    idx_p = 0 if item['Prioridad']=="Urgente" else (2 if item['Prioridad']=="Bajo" else 1)
-                    cp.selectbox("Prio", ["🔴 Urgente", "🔵 Medio", "⚪ Bajo"], index=idx_p, key=f"p_{i}", label_visibility="collapsed", on_change=update_val, args=(i, 'Prioridad', f"p_{i}"))
-                    idx_a = 0 if "Disponible" in item['Abasto'] else (1 if "Pedido" in item['Abasto'] else (2 if "Back" in item['Abasto'] else 3))
-                    cs.selectbox("Abasto", ["✅ Disponible", "📦 Pedido", "⚫ Back Order", "⚠️ REVISAR"], index=idx_a, key=f"a_{i}", label_visibility="collapsed", on_change=update_val, args=(i, 'Abasto', f"a_{i}"))
-                    ct.text_input("T.Ent", value=item['Tiempo Entrega'], key=f"t_{i}", label_visibility="collapsed", on_change=lambda idx=i: st.session_state.carrito[idx].update({'Tiempo Entrega': st.session_state[f"t_{idx}"]}))
-                    cq.number_input("Cant", min_value=1, value=int(item['Cantidad']), step=1, key=f"qn_{i}", label_visibility="collapsed", on_change=actualizar_cantidad_input, args=(i, f"qn_{i}"))
+                    cp.selectbox("Prio", list(OPCIONES_PRIORIDAD), index=prioridades.index(linea.prioridad), key=f"p_{i}", label_visibility="collapsed", on_change=actualizar_campo, args=(i, 'prioridad', f"p_{i}", OPCIONES_PRIORIDAD))
+                    cs.selectbox("Abasto", list(OPCIONES_ABASTO), index=abastos.index(linea.abasto), key=f"a_{i}", label_visibility="collapsed", on_change=actualizar_campo, args=(i, 'abasto', f"a_{i}", OPCIONES_ABASTO))
+                    ct.text_input("T.Ent", value=linea.tiempo_entrega, key=f"t_{i}", label_visibility="collapsed", on_change=actualizar_campo, args=(i, 'tiempo_entrega', f"t_{i}"))
+                    cq.number_input("Cant", min_value=1, value=linea.cantidad, step=1, key=f"qn_{i}", label_visibility="collapsed", on_change=actualizar_campo, args=(i, 'cantidad', f"qn_{i}"))
             else: st.caption("🚫 *Ítem excluido*")
 
-    items_activos = [i for i in st.session_state.carrito if i.get('Seleccionado', True)]
-    total_gral = sum(i['Importe Total'] for i in items_activos)
-    pendientes = [i for i in items_activos if "REVISAR" in str(i['Abasto'])]
-    
+    carrito = st.session_state.carrito
     st.divider()
-    st.metric(label="GRAN TOTAL (IVA INCLUIDO)", value=f"${total_gral:,.2f}")
+    st.metric(label="GRAN TOTAL (IVA INCLUIDO)", value=f"${cotizacion.a_pesos(carrito.total):,.2f}")
     
-    if pendientes: st.error(f"🛑 Hay {len(pendientes)} partida(s) marcadas como 'REVISAR' activas.")
+    if carrito.pendientes: st.error(f"🛑 Hay {carrito.pendientes} partida(s) marcadas como 'REVISAR' activas.")
     else:
         c1, c2, c3 = st.columns(3)
         with c1: 
             if st.button("VISTA PREVIA", type="secondary"): toggle_preview(); st.rerun()
         with c2: 
-            if items_activos:
-                st.download_button("GENERAR PDF", generar_pdf(), f"Cot_{st.session_state.orden}.pdf", "application/pdf", type="primary")
+            if carrito.activas:
+                # Se arma solo al pedirlo y una vez por estado; cambiar cantidades o casillas no lo reconstruye
+                fecha_pdf = obtener_hora_mx().strftime("%d/%m/%Y"); huella_pdf = huella_cotizacion(fecha_pdf)
+                if st.session_state.pdf_pedido == huella_pdf:
+                    st.download_button("DESCARGAR PDF", pdf_cotizacion(huella_pdf, fecha_pdf, estado_sesion()), f"Cot_{st.session_state.orden}.pdf", "application/pdf", type="primary")
+                elif st.button("GENERAR PDF", type="primary"): st.session_state.pdf_pedido = huella_pdf; st.rerun()
         with c3:
             link_wa = generar_link_whatsapp()
             st.markdown(f'<a href="{link_wa}" target="_blank" class="wa-btn">📱 ENVIAR POR WHATSAPP</a>', unsafe_allow_html=True)
@@ -583,32 +434,26 @@ if st.session_state.carrito:
 if st.session_state.ver_preview:
     if not st.session_state.carrito: st.warning("⚠️ El carrito está vacío.")
     else:
-        html_content = ""; total_preview = 0
+        html_content = ""
         leyenda_html = "<div class='legend-bar'><span>LEYENDA:</span><span class='badge-base badge-urg'>URGENTE (Rojo)</span><span class='badge-base badge-med'>MEDIO (Azul)</span><span class='badge-base badge-baj'>BAJO (Gris)</span><span style='margin-left:10px;'>|</span><span class='status-base status-disp'>DISPONIBLE</span><span class='status-base status-ped'>POR PEDIDO</span><span class='status-base status-bo'>BACK ORDER</span></div>"
         
-        # 1. MOSTRAR REFACCIONES PRIMERO
-        refacciones_view = [i for i in st.session_state.carrito if i.get('Seleccionado', True) and i['Tipo'] != "Mano de Obra"]
-        if refacciones_view:
-            for prio in ['Urgente', 'Medio', 'Bajo']:
-                grupo = [i for i in refacciones_view if i['Prioridad'] == prio]
-                if not grupo: continue
-                subtotal_html = sum(i['Importe Total'] for i in grupo); total_preview += subtotal_html
-                html_content += f"<div class='group-header'><span>REFACCIONES - {prio}</span><span>SUB: ${subtotal_html:,.2f}</span></div><table class='custom-table'><thead><tr><th>SKU</th><th>DESC</th><th>ESTATUS</th><th>CANT</th><th>TOTAL</th></tr></thead><tbody>"
-                for item in grupo:
-                    a_c = "status-disp" if "Disponible" in item['Abasto'] else ("status-ped" if "Pedido" in item['Abasto'] else "status-bo")
-                    html_content += f"<tr><td>{item['SKU']}</td><td>{item['Descripción']}</td><td><span class='status-base {a_c}'>{item['Abasto']}</span></td><td style='text-align:center'>{item['Cantidad']}</td><td style='text-align:right'>${item['Importe Total']:,.2f}</td></tr>"
-                html_content += "</tbody></table>"
-
-        # 2. MOSTRAR MANO DE OBRA AL FINAL
-        mo_view = [i for i in st.session_state.carrito if i.get('Seleccionado', True) and i['Tipo'] == "Mano de Obra"]
-        if mo_view:
-            subtotal_mo = sum(i['Importe Total'] for i in mo_view); total_preview += subtotal_mo
-            html_content += f"<div class='group-header' style='border-left: 8px solid #333;'><span>MANO DE OBRA</span><span>SUB: ${subtotal_mo:,.2f}</span></div><table class='custom-table'><thead><tr><th>CÓDIGO</th><th>SERVICIO</th><th>TIPO</th><th>CANT</th><th>TOTAL</th></tr></thead><tbody>"
-            for item in mo_view:
-                html_content += f"<tr><td>{item['SKU']}</td><td>{item['Descripción']}</td><td><span class='status-base' style='background:#e0e0e0; color:#333;'>SERVICIO</span></td><td style='text-align:center'>1</td><td style='text-align:right'>${item['Importe Total']:,.2f}</td></tr>"
+        # Refacciones por prioridad y al final mano de obra (el orden de cotizacion.GRUPOS)
+        carrito = st.session_state.carrito; total_preview = carrito.total
+        clase_abasto = {cotizacion.Abasto.DISPONIBLE: "status-disp", cotizacion.Abasto.PEDIDO: "status-ped"}
+        for grupo, lineas in carrito.por_grupo():
+            subtotal_html = cotizacion.a_pesos(carrito.subtotal(grupo))
+            if grupo is cotizacion.Tipo.MANO_OBRA:
+                html_content += f"<div class='group-header' style='border-left: 8px solid #333;'><span>MANO DE OBRA</span><span>SUB: ${subtotal_html:,.2f}</span></div><table class='custom-table'><thead><tr><th>CÓDIGO</th><th>SERVICIO</th><th>TIPO</th><th>CANT</th><th>TOTAL</th></tr></thead><tbody>"
+                for linea in lineas:
+                    html_content += f"<tr><td>{linea.sku}</td><td>{linea.descripcion}</td><td><span class='status-base' style='background:#e0e0e0; color:#333;'>SERVICIO</span></td><td style='text-align:center'>1</td><td style='text-align:right'>${cotizacion.a_pesos(linea.importe):,.2f}</td></tr>"
+            else:
+                html_content += f"<div class='group-header'><span>REFACCIONES - {grupo.value}</span><span>SUB: ${subtotal_html:,.2f}</span></div><table class='custom-table'><thead><tr><th>SKU</th><th>DESC</th><th>ESTATUS</th><th>CANT</th><th>TOTAL</th></tr></thead><tbody>"
+                for linea in lineas:
+                    a_c = clase_abasto.get(linea.abasto, "status-bo")
+                    html_content += f"<tr><td>{linea.sku}</td><td>{linea.descripcion}</td><td><span class='status-base {a_c}'>{linea.abasto.value}</span></td><td style='text-align:center'>{linea.cantidad}</td><td style='text-align:right'>${cotizacion.a_pesos(linea.importe):,.2f}</td></tr>"
             html_content += "</tbody></table>"
 
-        final_html = f"<div class='preview-container'><div class='preview-paper'><div class='preview-header'><h1 class='preview-title'>TOYOTA LOS FUERTES</h1></div>{leyenda_html}{html_content}<div class='total-box'><div class='total-final'>TOTAL: ${total_preview:,.2f}</div></div></div></div>"
+        final_html = f"<div class='preview-container'><div class='preview-paper'><div class='preview-header'><h1 class='preview-title'>TOYOTA LOS FUERTES</h1></div>{leyenda_html}{html_content}<div class='total-box'><div class='total-final'>TOTAL: ${cotizacion.a_pesos(total_preview):,.2f}</div></div></div></div>"
         st.markdown(final_html, unsafe_allow_html=True)
 elif st.session_state.ver_preview and not st.session_state.carrito:
     st.session_state.ver_preview = False
@@ -0,0 +1,270 @@
+"""Traducción de descripciones con cache persistente (NOM-050: descripciones en español).
+
+Dos niveles delante de GoogleTranslator:
+1. LRU en memoria del proceso (microsegundos).
+2. SQLite en disco, compartido entre procesos y reinicios.
+
+Si el traductor no responde se devuelve el texto original (no se guarda) y se deja de
+intentar durante `ESPERA_SIN_RED` segundos, así la app sigue funcionando sin red.
+
+Pretraducción del catálogo completo (fuera de línea, reanudable):
+
+    python traduccion.py --concurrencia 8 --lote 200
+    python traduccion.py --traductor eco          # stub local, sin red (pruebas): SQLite en memoria, sin DESC_ES
+
+Las traducciones se guardan por lote en el SQLite, así que si se interrumpe basta con
+volver a correrlo. Al final se escribe la columna DESC_ES en el cache del catálogo.
+"""
+import argparse
+import importlib
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as TiempoAgotado
+
+from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests
+
+ARCHIVO_CACHE = "traducciones.sqlite"
+TAMANO_LRU = 20000
+ESPERA_SIN_RED = 60
+HILOS_IMPORTACION = 8
+TIEMPO_MAX_IMPORTACION = 15
+# Sin red, timeout o límite del servicio: solo estos cortan el traductor por ESPERA_SIN_RED
+# (las excepciones de requests heredan de OSError)
+ERRORES_RED = (OSError, RequestError, TooManyRequests)
+
+class CacheTraducciones:
+    def __init__(self, ruta=ARCHIVO_CACHE, tamano_lru=TAMANO_LRU, traductor=None):
+        self.ruta = ruta
+        self.tamano_lru = tamano_lru
+        # traductor(texto, origen, destino) -> str. Por defecto GoogleTranslator.
+        self.traductor = traductor or (lambda texto, origen, destino: GoogleTranslator(source=origen, target=destino).translate(texto))
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._sin_red_hasta = 0.0
+        self.stats = {'memoria': 0, 'disco': 0, 'traductor': 0, 'fallos': 0}
+        self._db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS traducciones ("
+            " origen TEXT NOT NULL, destino TEXT NOT NULL, texto TEXT NOT NULL, traduccion TEXT NOT NULL,"
+            " PRIMARY KEY (origen, destino, texto))"
+        )
+
+    def _recordar(self, clave, traduccion):
+        self._lru[clave] = traduccion
+        self._lru.move_to_end(clave)
+        if len(self._lru) > self.tamano_lru: self._lru.popitem(last=False)
+
+    def buscar(self, texto, origen='en', destino='es'):
+        """Traducción ya conocida (memoria o disco) o None, sin llamar al traductor."""
+        clave = (origen, destino, texto)
+        with self._lock:
+            if clave in self._lru:
+                self._lru.move_to_end(clave); self.stats['memoria'] += 1
+                return self._lru[clave]
+            fila = self._db.execute(
+                "SELECT traduccion FROM traducciones WHERE origen=? AND destino=? AND texto=?", clave
+            ).fetchone()
+            if fila:
+                self._recordar(clave, fila[0]); self.stats['disco'] += 1
+                return fila[0]
+        return None
+
+    def guardar(self, texto, traduccion, origen='en', destino='es'):
+        clave = (origen, destino, texto)
+        with self._lock:
+            self._recordar(clave, traduccion)
+            try: self._db.execute("INSERT OR REPLACE INTO traducciones VALUES (?, ?, ?, ?)", (*clave, traduccion))
+            except sqlite3.Error: pass  # Disco lleno o bloqueado: queda al menos en memoria
+
+    def guardar_lote(self, pares, origen='en', destino='es'):
+        """Guarda [(texto, traduccion), ...] en una sola transacción (punto de control)."""
+        with self._lock:
+            for texto, traduccion in pares: self._recordar((origen, destino, texto), traduccion)
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO traducciones VALUES (?, ?, ?, ?)",
+                    [(origen, destino, texto, traduccion) for texto, traduccion in pares],
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")  # Sin esto la conexión queda en la transacción y ya no escribe
+                raise
+
+    def todas(self, origen='en', destino='es'):
+        """Diccionario texto -> traducción de todo lo guardado en disco para el par de idiomas."""
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT texto, traduccion FROM traducciones WHERE origen=? AND destino=?", (origen, destino)
+            ))
+
+    def precargar(self, limite=None):
+        """Sube a la LRU las traducciones guardadas más recientes (calentamiento al iniciar)."""
+        limite = self.tamano_lru if limite is None else limite
+        with self._lock:
+            filas = self._db.execute(
+                "SELECT origen, destino, texto, traduccion FROM traducciones ORDER BY rowid DESC LIMIT ?", (limite,)
+            ).fetchall()
+            for origen, destino, texto, traduccion in reversed(filas): self._recordar((origen, destino, texto), traduccion)
+        return len(filas)
+
+    def traducir(self, texto, origen='en', destino='es'):
+        texto = str(texto)
+        if not texto.strip(): return texto
+        conocida = self.buscar(texto, origen, destino)
+        if conocida is not None: return conocida
+        if time.monotonic() < self._sin_red_hasta:
+            self._contar('fallos')
+            return texto
+        try:
+            traduccion = self.traductor(texto, origen, destino)
+        except ERRORES_RED:
+            with self._lock:
+                self.stats['fallos'] += 1
+                self._sin_red_hasta = time.monotonic() + ESPERA_SIN_RED
+            return texto
+        except Exception:
+            traduccion = None
+        if not traduccion:  # Falla o respuesta vacía de este texto: no se guarda y se reintenta después
+            self._contar('fallos')
+            return texto
+        self._contar('traductor')
+        self.guardar(texto, traduccion, origen, destino)
+        return traduccion
+
+    def _contar(self, campo):
+        with self._lock: self.stats[campo] += 1
+
+    def estadisticas(self):
+        with self._lock:
+            stats, en_memoria = dict(self.stats), len(self._lru)
+        aciertos = stats['memoria'] + stats['disco']
+        total = aciertos + stats['traductor'] + stats['fallos']
+        return {**stats, 'en_memoria': en_memoria, 'tasa_aciertos': aciertos / total if total else 0.0}
+
+# ==========================================
+# INSTANCIA DEL PROCESO
+# ==========================================
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try: _cache = CacheTraducciones()
+            except sqlite3.Error:
+                _cache = CacheTraducciones(":memory:")  # Disco de solo lectura: solo memoria
+    return _cache
+
+def traducir(texto, origen='en', destino='es'):
+    return obtener_cache().traducir(texto, origen, destino)
+
+def estadisticas():
+    return obtener_cache().estadisticas()
+
+def calentar():
+    """Abre el SQLite y precarga la LRU: la primera importación no paga la lectura en disco."""
+    return obtener_cache().precargar()
+
+def traducir_varios(textos, origen='en', destino='es', max_hilos=HILOS_IMPORTACION, tiempo_max=TIEMPO_MAX_IMPORTACION, progreso=None):
+    """Traduce varios textos en paralelo (importación de archivos). Devuelve {texto: traducción}.
+
+    Lo que ya está en cache se resuelve sin hilos. Lo que falle o no termine en
+    `tiempo_max` segundos se queda con el texto original. `progreso(hechas, total)`
+    se llama desde el hilo que invoca (seguro para actualizar widgets de Streamlit).
+    """
+    cache = obtener_cache()
+    unicos = list(dict.fromkeys(str(t) for t in textos))
+    resultado = {}
+    pendientes = []
+    for texto in unicos:
+        conocida = cache.buscar(texto, origen, destino) if texto.strip() else texto
+        if conocida is None: pendientes.append(texto)
+        else: resultado[texto] = conocida
+    if progreso: progreso(len(resultado), len(unicos))
+    if pendientes:
+        ex = ThreadPoolExecutor(max_workers=max_hilos)
+        futuros = {ex.submit(cache.traducir, texto, origen, destino): texto for texto in pendientes}
+        try:
+            for fut in as_completed(futuros, timeout=tiempo_max):
+                resultado[futuros[fut]] = fut.result()
+                if progreso: progreso(len(resultado), len(unicos))
+        except TiempoAgotado:
+            pass
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
+    return {texto: resultado.get(texto, texto) for texto in unicos}
+
+# ==========================================
+# PRETRADUCCIÓN POR LOTES
+# ==========================================
+def google(texto, origen, destino):
+    return GoogleTranslator(source=origen, target=destino).translate(texto)
+
+def eco(texto, origen, destino):
+    """Stub local: devuelve el mismo texto (pruebas sin red)."""
+    return texto
+
+def cargar_traductor(nombre):
+    """'google', 'eco' o 'modulo:funcion' con firma funcion(texto, origen, destino)."""
+    if nombre in ('google', 'eco'): return globals()[nombre]
+    modulo, _, funcion = nombre.partition(':')
+    return getattr(importlib.import_module(modulo), funcion)
+
+def pretraducir(textos, cache, traductor, origen='en', destino='es', concurrencia=8, lote=200, progreso=None):
+    """Traduce los textos únicos que aún no estén en `cache`. Devuelve {'nuevas', 'fallidas', 'total'}.
+
+    Cada lote se guarda en una transacción al terminar: interrumpir y volver a correr
+    retoma donde se quedó. Los fallos no se guardan y se reintentan en la siguiente corrida.
+    """
+    conocidas = cache.todas(origen, destino)
+    pendientes = sorted({t for t in textos if isinstance(t, str) and t.strip() and t not in conocidas})
+    resumen = {'nuevas': 0, 'fallidas': 0, 'total': len(pendientes)}
+
+    def traducir_uno(texto):
+        try: return texto, traductor(texto, origen, destino)
+        except Exception: return texto, None
+
+    with ThreadPoolExecutor(max_workers=concurrencia) as ex:
+        for inicio in range(0, len(pendientes), lote):
+            resultados = list(ex.map(traducir_uno, pendientes[inicio:inicio + lote]))
+            buenas = [(t, tr) for t, tr in resultados if tr]
+            if buenas: cache.guardar_lote(buenas, origen, destino)
+            resumen['nuevas'] += len(buenas)
+            resumen['fallidas'] += len(resultados) - len(buenas)
+            if progreso: progreso(min(inicio + lote, len(pendientes)), len(pendientes))
+    return resumen
+
+if __name__ == "__main__":
+    import catalogo
+    parser = argparse.ArgumentParser(description="Pretraduce las descripciones del catálogo a español")
+    parser.add_argument("--traductor", default="google", help="google | eco | modulo:funcion")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--lote", type=int, default=200)
+    parser.add_argument("--origen", default="en")
+    parser.add_argument("--cache", default=None, help=f"SQLite de traducciones (por defecto {ARCHIVO_CACHE}; con eco, :memory:)")
+    args = parser.parse_args()
+    # El stub devuelve el mismo texto: no debe quedar como traducción en el SQLite ni en DESC_ES
+    prueba = args.traductor == 'eco'
+
+    df, c_sku, c_desc, _ = catalogo.cargar_catalogo()
+    if df is None: sys.exit("Sin catálogo.")
+    cache = CacheTraducciones(args.cache or ":memory:") if prueba or args.cache else obtener_cache()
+    t0 = time.perf_counter()
+    resumen = pretraducir(
+        df[c_desc].dropna().unique().tolist(), cache, cargar_traductor(args.traductor),
+        origen=args.origen, concurrencia=args.concurrencia, lote=args.lote,
+        progreso=lambda hechas, total: print(f"\r{hechas:,}/{total:,}", end="", flush=True),
+    )
+    print(f"\nNuevas: {resumen['nuevas']:,}  Fallidas: {resumen['fallidas']:,}  ({time.perf_counter() - t0:.1f}s)")
+    if prueba:
+        print("Traductor eco: no se escribe DESC_ES en el catálogo.")
+    else:
+        n = catalogo.guardar_desc_es(cache.todas(args.origen, 'es'))
+        print(f"DESC_ES escrita en {catalogo.ARCHIVO_CACHE}: {n:,} filas traducidas de {len(df):,}")